@@ -0,0 +1,299 @@
+"""Server-side summary tables for the scouting data.
+
+Instead of re-aggregating every row of scores_tb on each load, the database keeps
+three small summary tables up to date:
+
+- summary_team_tb            one row per team
+- summary_team_challenge_tb  one row per (team, challenge)
+- summary_team_phase_tb      one row per (team, challenge, phase)
+
+They are maintained incrementally, either by AFTER INSERT triggers on scores_tb
+(instalar_resumos(conn, triggers=True)) or by an ingest job that calls
+atualizar_resumos with the rows it just inserted. Running this module checks both
+paths against the raw aggregation on a local SQLite stand-in."""
+import pandas as pd
+
+from banco_local import dialeto, marcador
+from pontuacao import calcular_pontos, ranquear, pontos_da_fase
+
+# Summary tables, their key columns and the columns summed into them
+NIVEIS_RESUMO = {
+    'summary_team_tb': ['event', 'team'],
+    'summary_team_challenge_tb': ['event', 'team', 'challenge_id'],
+    'summary_team_phase_tb': ['event', 'team', 'challenge_id', 'phase_id'],
+}
+COLUNAS_SOMADAS = ['completed_autonomous', 'completed_teleop', 'auto_points', 'teleop_points', 'total_points']
+
+# Query used to aggregate from the raw rows (full rebuilds and checks)
+RAW_QUERY = """
+    SELECT
+        {evento} as event,
+        r.team,
+        c.id as challenge_id,
+        c.name as challenge_name,
+        cp.id as phase_id,
+        cp.name as phase_name,
+        s.completed_autonomous,
+        s.completed_teleop
+    FROM scores_tb s
+    JOIN robots_tb r ON s.robot_id = r.id
+    JOIN challenge_tb c ON s.challenge_id = c.id
+    JOIN challenge_phases_tb cp ON s.phase_id = cp.id
+    """
+
+def _expressao_evento(conn):
+    """Event key of a robots_tb row aliased r; '' on databases without the event column"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM robots_tb LIMIT 0")
+    colunas = [descricao[0].lower() for descricao in cursor.description]
+    cursor.fetchall()
+    return "COALESCE(r.event, '')" if 'event' in colunas else "''"
+
+def _ddl_resumo(tabela, chaves):
+    tipos = {'event': 'VARCHAR(100)', 'team': 'VARCHAR(100)', 'challenge_id': 'INTEGER', 'phase_id': 'INTEGER'}
+    colunas = [f"{chave} {tipos[chave]} NOT NULL" for chave in chaves]
+    colunas += [f"{coluna} DOUBLE NOT NULL DEFAULT 0" for coluna in COLUNAS_SOMADAS]
+    return f"CREATE TABLE IF NOT EXISTS {tabela} ({', '.join(colunas)}, PRIMARY KEY ({', '.join(chaves)}))"
+
+def _clausula_upsert(conn, tabela, chaves):
+    """Dialect-specific 'add to the existing row' clause of an INSERT.
+
+    The current values are qualified with the table name: in the trigger the SELECT
+    also reads phase_points_tb, whose auto_points/teleop_points would be ambiguous."""
+    if dialeto(conn) == 'sqlite':
+        somas = ", ".join(f"{c} = {tabela}.{c} + excluded.{c}" for c in COLUNAS_SOMADAS)
+        return f"ON CONFLICT ({', '.join(chaves)}) DO UPDATE SET {somas}"
+    somas = ", ".join(f"{tabela}.{c} = {tabela}.{c} + VALUES({c})" for c in COLUNAS_SOMADAS)
+    return f"ON DUPLICATE KEY UPDATE {somas}"
+
+def _sql_trigger(conn):
+    """AFTER INSERT trigger folding each new score row into the three summary tables"""
+    pontos_auto = "NEW.completed_autonomous * COALESCE(pp.auto_points, 0)"
+    pontos_teleop = "NEW.completed_teleop * COALESCE(pp.teleop_points, 0)"
+    valores = {
+        'event': _expressao_evento(conn),
+        'team': "r.team",
+        'challenge_id': "NEW.challenge_id",
+        'phase_id': "NEW.phase_id",
+    }
+
+    comandos = []
+    for tabela, chaves in NIVEIS_RESUMO.items():
+        comandos.append(
+            f"INSERT INTO {tabela} ({', '.join(chaves + COLUNAS_SOMADAS)}) "
+            f"SELECT {', '.join(valores[chave] for chave in chaves)}, "
+            f"NEW.completed_autonomous, NEW.completed_teleop, {pontos_auto}, {pontos_teleop}, "
+            f"{pontos_auto} + {pontos_teleop} "
+            f"FROM robots_tb r LEFT JOIN phase_points_tb pp ON pp.phase_id = NEW.phase_id "
+            f"WHERE r.id = NEW.robot_id "
+            f"{_clausula_upsert(conn, tabela, chaves)};"
+        )
+
+    corpo = "\n    ".join(comandos)
+    if dialeto(conn) == 'sqlite':
+        return f"CREATE TRIGGER IF NOT EXISTS scores_summary_ai AFTER INSERT ON scores_tb\nBEGIN\n    {corpo}\nEND"
+    return f"CREATE TRIGGER scores_summary_ai AFTER INSERT ON scores_tb FOR EACH ROW\nBEGIN\n    {corpo}\nEND"
+
+def sincronizar_pontos_fases(conn):
+    """Copies POINTS_MAP into phase_points_tb so the triggers can price each phase"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name FROM challenge_phases_tb")
+    linhas = [(phase_id,) + pontos_da_fase(nome) for phase_id, nome in cursor.fetchall()]
+
+    cursor.execute("DELETE FROM phase_points_tb")
+    m = marcador(conn)
+    cursor.executemany(f"INSERT INTO phase_points_tb (phase_id, auto_points, teleop_points) VALUES ({m}, {m}, {m})", linhas)
+    conn.commit()
+
+def instalar_resumos(conn, triggers=True):
+    """Creates the summary tables (and optionally the triggers) and fills them from scratch"""
+    cursor = conn.cursor()
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS phase_points_tb ("
+        "phase_id INTEGER NOT NULL PRIMARY KEY, "
+        "auto_points DOUBLE NOT NULL DEFAULT 0, "
+        "teleop_points DOUBLE NOT NULL DEFAULT 0)"
+    )
+    # Rebuilt from scratch below, so tables from an older key layout are simply replaced
+    for tabela, chaves in NIVEIS_RESUMO.items():
+        cursor.execute(f"DROP TABLE IF EXISTS {tabela}")
+        cursor.execute(_ddl_resumo(tabela, chaves))
+
+    cursor.execute("DROP TRIGGER IF EXISTS scores_summary_ai")
+    conn.commit()
+    sincronizar_pontos_fases(conn)
+
+    # The trigger is created only once the tables are filled, in the same transaction
+    # on SQLite (MySQL commits implicitly on DDL), so a failed rebuild cannot leave a
+    # trigger behind that breaks every later insert into scores_tb
+    try:
+        reconstruir_resumos(conn, commit=False)
+        if triggers:
+            cursor.execute(_sql_trigger(conn))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def remover_triggers(conn):
+    """Drops the trigger, leaving the summary tables to the ingest job"""
+    conn.cursor().execute("DROP TRIGGER IF EXISTS scores_summary_ai")
+    conn.commit()
+
+def _somar_niveis(df):
+    """Aggregates processed rows to each summary level"""
+    return {
+        tabela: df.groupby(chaves, as_index=False)[COLUNAS_SOMADAS].sum()
+        for tabela, chaves in NIVEIS_RESUMO.items()
+    }
+
+def _gravar_incrementos(conn, incrementos):
+    cursor = conn.cursor()
+    m = marcador(conn)
+    for tabela, chaves in NIVEIS_RESUMO.items():
+        colunas = chaves + COLUNAS_SOMADAS
+        sql = (
+            f"INSERT INTO {tabela} ({', '.join(colunas)}) "
+            f"VALUES ({', '.join([m] * len(colunas))}) "
+            f"{_clausula_upsert(conn, tabela, chaves)}"
+        )
+        linhas = incrementos[tabela][colunas].astype(object).values.tolist()
+        if linhas:
+            cursor.executemany(sql, linhas)
+
+def atualizar_resumos(conn, linhas, commit=True):
+    """Ingest-job path: folds newly inserted score rows into the summary tables.
+
+    linhas is a DataFrame with robot_id, challenge_id, phase_id, completed_autonomous
+    and completed_teleop. Only the affected summary rows are touched. Pass
+    commit=False to keep the update inside the caller's transaction."""
+    if linhas.empty:
+        return
+
+    cursor = conn.cursor()
+    m = marcador(conn)
+    robot_ids = sorted({int(robot_id) for robot_id in linhas['robot_id']})
+    cursor.execute(
+        f"SELECT r.id, r.team, {_expressao_evento(conn)} FROM robots_tb r "
+        f"WHERE r.id IN ({', '.join([m] * len(robot_ids))})",
+        robot_ids
+    )
+    robos = cursor.fetchall()
+    equipes = {robot_id: team for robot_id, team, _ in robos}
+    eventos = {robot_id: event for robot_id, _, event in robos}
+    cursor.execute("SELECT id, name FROM challenge_phases_tb")
+    fases = dict(cursor.fetchall())
+
+    df = linhas[['robot_id', 'challenge_id', 'phase_id', 'completed_autonomous', 'completed_teleop']].copy()
+    df['team'] = df['robot_id'].map(equipes)
+    df['event'] = df['robot_id'].map(eventos)
+    df['phase_name'] = df['phase_id'].map(fases)
+    df = calcular_pontos(df.dropna(subset=['team']))
+
+    _gravar_incrementos(conn, _somar_niveis(df))
+    if commit:
+        conn.commit()
+
+def reconstruir_resumos(conn, commit=True):
+    """Rebuilds every summary table from the raw score rows"""
+    df = calcular_pontos(pd.read_sql(RAW_QUERY.format(evento=_expressao_evento(conn)), conn))
+
+    cursor = conn.cursor()
+    for tabela in NIVEIS_RESUMO:
+        cursor.execute(f"DELETE FROM {tabela}")
+    _gravar_incrementos(conn, _somar_niveis(df))
+    if commit:
+        conn.commit()
+
+def carregar_resumos(conn, evento=None):
+    """Reads the summary tables in the shapes the dashboard works with.
+
+    Returns a processed-like frame with one row per (team, challenge, phase), plus the
+    team and challenge rankings with the same columns as calcular_rankings. With an
+    evento only that event's rows are read (and the frame gets an event column);
+    otherwise every event is summed together."""
+    m = marcador(conn)
+    filtro, params = ("WHERE s.event = " + m, (evento,)) if evento is not None else ("", None)
+    somas = ", ".join(f"SUM(s.{c}) as {c}" for c in COLUNAS_SOMADAS)
+
+    df = pd.read_sql(
+        f"""
+        SELECT s.team, s.challenge_id, c.name as challenge_name, s.phase_id, cp.name as phase_name, {somas}
+        FROM summary_team_phase_tb s
+        JOIN challenge_tb c ON s.challenge_id = c.id
+        JOIN challenge_phases_tb cp ON s.phase_id = cp.id
+        {filtro}
+        GROUP BY s.team, s.challenge_id, c.name, s.phase_id, cp.name
+        """,
+        conn, params=params
+    )
+    if evento is not None:
+        df['event'] = evento
+
+    team_rankings = ranquear(pd.read_sql(
+        f"""
+        SELECT s.team, SUM(s.auto_points) as auto_points, SUM(s.teleop_points) as teleop_points,
+               SUM(s.total_points) as total_points
+        FROM summary_team_tb s
+        {filtro}
+        GROUP BY s.team
+        """,
+        conn, params=params
+    ))
+
+    challenge_rankings = pd.read_sql(
+        f"""
+        SELECT s.team, c.name as challenge_name, SUM(s.auto_points) as auto_points,
+               SUM(s.teleop_points) as teleop_points, SUM(s.total_points) as total_points
+        FROM summary_team_challenge_tb s
+        JOIN challenge_tb c ON s.challenge_id = c.id
+        {filtro}
+        GROUP BY s.team, c.name
+        """,
+        conn, params=params
+    )
+
+    return df, team_rankings, challenge_rankings
+
+def resumir_fases(df):
+    """Collapses processed rows to the per-(team, challenge, phase) shape of carregar_resumos"""
+    chaves = ['team', 'challenge_id', 'challenge_name', 'phase_id', 'phase_name']
+    if 'event' in df:
+        chaves.append('event')
+    return df.groupby(chaves, as_index=False)[COLUNAS_SOMADAS].sum()
+
+def verificar_resumos(conn):
+    """Compares the summary tables with the raw aggregation.
+
+    Returns the names of the summary tables whose contents differ (empty when equal)."""
+    esperado = _somar_niveis(calcular_pontos(pd.read_sql(RAW_QUERY.format(evento=_expressao_evento(conn)), conn)))
+
+    divergentes = []
+    for tabela, chaves in NIVEIS_RESUMO.items():
+        atual = pd.read_sql(f"SELECT * FROM {tabela}", conn)
+        a = esperado[tabela].sort_values(chaves).reset_index(drop=True)
+        b = atual[chaves + COLUNAS_SOMADAS].sort_values(chaves).reset_index(drop=True)
+        try:
+            pd.testing.assert_frame_equal(a, b, check_dtype=False)
+        except AssertionError:
+            divergentes.append(tabela)
+
+    return divergentes
+
+if __name__ == "__main__":
+    from banco_local import criar_banco_local, popular_banco_local
+
+    for modo in ['trigger', 'ingest job']:
+        conn = criar_banco_local()
+        popular_banco_local(conn, seed=1)
+        instalar_resumos(conn, triggers=(modo == 'trigger'))
+
+        # Insert a second batch of entries after the summaries exist
+        antes = conn.execute("SELECT COALESCE(MAX(id), 0) FROM scores_tb").fetchone()[0]
+        popular_banco_local(conn, n_equipes=45, entradas_por_equipe=3, eventos=("LOCAL", "REGIONAL"), seed=2)
+        if modo == 'ingest job':
+            novas = pd.read_sql(f"SELECT * FROM scores_tb WHERE id > {antes}", conn)
+            atualizar_resumos(conn, novas)
+
+        divergentes = verificar_resumos(conn)
+        print(f"{modo}: {'OK' if not divergentes else 'MISMATCH in ' + ', '.join(divergentes)}")
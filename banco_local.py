@@ -0,0 +1,99 @@
+"""Local SQLite stand-in for the scouting database.
+
+Mirrors the tables the dashboard reads (robots_tb, challenge_tb, challenge_phases_tb
+and scores_tb) so that aggregation, ingestion and loading paths can be checked and
+benchmarked without the MySQL server."""
+import random
+import sqlite3
+
+# Challenges and phases of the REEFSCAPE game, as named in challenge_phases_tb
+DESAFIOS_LOCAIS = {
+    'AUTO': ['LEAVE'],
+    'CORAL': ['CORAL L1', 'CORAL L2', 'CORAL L3', 'CORAL L4'],
+    'ALGAE': ['PROCESSOR', 'NET'],
+    'ENDGAME': ['BARGE', 'SHALLOW_CAGE', 'DEEP_CAGE']
+}
+
+SCHEMA_LOCAL = """
+CREATE TABLE IF NOT EXISTS robots_tb (
+    id INTEGER PRIMARY KEY,
+    team TEXT NOT NULL,
+    location TEXT,
+    alliance TEXT,
+    event TEXT
+);
+CREATE TABLE IF NOT EXISTS challenge_tb (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS challenge_phases_tb (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores_tb (
+    id INTEGER PRIMARY KEY,
+    robot_id INTEGER NOT NULL REFERENCES robots_tb(id),
+    challenge_id INTEGER NOT NULL REFERENCES challenge_tb(id),
+    phase_id INTEGER NOT NULL REFERENCES challenge_phases_tb(id),
+    completed_autonomous INTEGER NOT NULL DEFAULT 0,
+    completed_teleop INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+def dialeto(conn):
+    """'sqlite' for the local stand-in, 'mysql' for the real database"""
+    return 'sqlite' if isinstance(conn, sqlite3.Connection) else 'mysql'
+
+def marcador(conn):
+    """Parameter placeholder of the connection's driver"""
+    return '?' if dialeto(conn) == 'sqlite' else '%s'
+
+def criar_banco_local(caminho=":memory:"):
+    """Creates (or opens) a SQLite database with the scouting schema"""
+    conn = sqlite3.connect(caminho, check_same_thread=False)
+    conn.executescript(SCHEMA_LOCAL)
+    conn.commit()
+    return conn
+
+def popular_banco_local(conn, n_equipes=40, entradas_por_equipe=12, eventos=("LOCAL",), seed=0):
+    """Fills the stand-in with synthetic scouting entries.
+    
+    Every robot entry gets one score row per phase, with completion counts drawn from
+    a per-team skill level so that rankings are not uniform."""
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+    
+    fases = {}
+    for challenge_id, (desafio, nomes_fases) in enumerate(DESAFIOS_LOCAIS.items(), start=1):
+        cursor.execute("INSERT OR IGNORE INTO challenge_tb (id, name) VALUES (?, ?)", (challenge_id, desafio))
+        for nome in nomes_fases:
+            phase_id = len(fases) + 1
+            cursor.execute("INSERT OR IGNORE INTO challenge_phases_tb (id, name) VALUES (?, ?)", (phase_id, nome))
+            fases[phase_id] = challenge_id
+    
+    equipes = [f"{1000 + i} TEAM{i}" for i in range(n_equipes)]
+    habilidade = {equipe: rng.uniform(0.2, 1.0) for equipe in equipes}
+    
+    robots = []
+    scores = []
+    robot_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM robots_tb").fetchone()[0]
+    for evento in eventos:
+        for _ in range(entradas_por_equipe):
+            for equipe in equipes:
+                robot_id += 1
+                robots.append((robot_id, equipe, rng.choice("123"), rng.choice(["red", "blue"]), evento))
+                for phase_id, challenge_id in fases.items():
+                    nivel = habilidade[equipe]
+                    scores.append((
+                        robot_id, challenge_id, phase_id,
+                        int(rng.random() < nivel) + int(rng.random() < nivel / 2),
+                        rng.randint(0, int(4 * nivel))
+                    ))
+    
+    cursor.executemany("INSERT INTO robots_tb (id, team, location, alliance, event) VALUES (?, ?, ?, ?, ?)", robots)
+    cursor.executemany(
+        "INSERT INTO scores_tb (robot_id, challenge_id, phase_id, completed_autonomous, completed_teleop) VALUES (?, ?, ?, ?, ?)",
+        scores
+    )
+    conn.commit()
+    return conn
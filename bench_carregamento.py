@@ -0,0 +1,73 @@
+"""Benchmark of the partitioned parallel loader against the single-query path.
+
+Uses a file-backed SQLite stand-in. A progress handler makes each connection yield
+periodically, emulating a slow database server, so the overlap between partition
+queries shows up as it would over the network.
+
+    python bench_carregamento.py [n_equipes] [entradas_por_equipe]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from banco_local import criar_banco_local, popular_banco_local
+from carregamento import PARTICIONAMENTOS, carregar_consulta_unica, carregar_particionado
+
+# Emulated server cost: sleep this long every LATENCIA_INSTRUCOES SQLite VM steps
+LATENCIA_SEGUNDOS = 0.002
+LATENCIA_INSTRUCOES = 5000
+
+def fabrica_conexoes(caminho, lento=True):
+    def conectar():
+        conn = criar_banco_local(caminho)
+        if lento:
+            conn.set_progress_handler(lambda: time.sleep(LATENCIA_SEGUNDOS), LATENCIA_INSTRUCOES)
+        return conn
+    return conectar
+
+def cronometrar(funcao, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+def mesmo_conteudo(a, b):
+    chaves = list(a.columns)
+    a = a.sort_values(chaves).reset_index(drop=True)
+    b = b[chaves].sort_values(chaves).reset_index(drop=True)
+    return a.equals(b)
+
+if __name__ == "__main__":
+    n_equipes = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    entradas = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "scouting.db")
+        popular_banco_local(criar_banco_local(caminho), n_equipes=n_equipes, entradas_por_equipe=entradas).close()
+
+        for lento in [False, True]:
+            conectar = fabrica_conexoes(caminho, lento)
+            print("slow server" if lento else "local server")
+
+            def consulta_unica():
+                conn = conectar()
+                try:
+                    return carregar_consulta_unica(conn)
+                finally:
+                    conn.close()
+
+            tempo_base, base = cronometrar(consulta_unica)
+            print(f"  single query              : {tempo_base:.3f}s ({len(base)} rows)")
+
+            for particionar_por in PARTICIONAMENTOS:
+                for paralelismo in [1, 2, 4, 8]:
+                    tempo, df = cronometrar(
+                        lambda: carregar_particionado(conectar, paralelismo=paralelismo, particionar_por=particionar_por)
+                    )
+                    print(
+                        f"  {particionar_por:>9} x {paralelismo} workers  : {tempo:.3f}s "
+                        f"({tempo_base / tempo:.2f}x, same rows: {mesmo_conteudo(base, df)})"
+                    )
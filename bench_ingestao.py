@@ -0,0 +1,80 @@
+"""Throughput benchmark of the bulk ingestion pipeline on the local SQLite stand-in.
+
+Compares IngestorScouting (validated, deduplicated, multi-row inserts in one
+transaction) with the one-row-at-a-time path the tablets used before.
+
+    python bench_ingestao.py [n_submissoes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from banco_local import DESAFIOS_LOCAIS, criar_banco_local, popular_banco_local
+from ingestao import IngestorScouting
+
+def gerar_submissoes(conn, n, seed=0, fracao_duplicada=0.05):
+    """Synthetic submission batch, with a share of repeated keys as tablets resend"""
+    rng = random.Random(seed)
+    robot_ids = [row[0] for row in conn.execute("SELECT id FROM robots_tb")]
+    fases = [fase for nomes in DESAFIOS_LOCAIS.values() for fase in nomes]
+    desafio_da_fase = {fase: desafio for desafio, nomes in DESAFIOS_LOCAIS.items() for fase in nomes}
+
+    submissoes = []
+    for i in range(n):
+        fase = rng.choice(fases)
+        submissoes.append({
+            'submission_key': f"tablet{i % 6}-{i}",
+            'robot_id': rng.choice(robot_ids),
+            'challenge': desafio_da_fase[fase],
+            'phase': fase,
+            'completed_autonomous': rng.randint(0, 2),
+            'completed_teleop': rng.randint(0, 4),
+        })
+    submissoes += rng.sample(submissoes, int(n * fracao_duplicada))
+    return submissoes
+
+def banco_temporario(diretorio, nome):
+    conn = criar_banco_local(os.path.join(diretorio, nome))
+    popular_banco_local(conn, n_equipes=60, entradas_por_equipe=2)
+    return conn
+
+def bench_linha_a_linha(conn, submissoes):
+    """Previous path: resolve ids with a query per row and commit every insert"""
+    inicio = time.perf_counter()
+    for s in submissoes:
+        challenge_id = conn.execute("SELECT id FROM challenge_tb WHERE name = ?", (s['challenge'],)).fetchone()[0]
+        phase_id = conn.execute("SELECT id FROM challenge_phases_tb WHERE name = ?", (s['phase'],)).fetchone()[0]
+        conn.execute(
+            "INSERT INTO scores_tb (robot_id, challenge_id, phase_id, completed_autonomous, completed_teleop) VALUES (?, ?, ?, ?, ?)",
+            (s['robot_id'], challenge_id, phase_id, s['completed_autonomous'], s['completed_teleop'])
+        )
+        conn.commit()
+    return time.perf_counter() - inicio
+
+def bench_ingestor(conn, submissoes, tamanho_lote):
+    ingestor = IngestorScouting(conn, tamanho_lote=tamanho_lote)
+    inicio = time.perf_counter()
+    resultado = ingestor.ingerir(submissoes)
+    return time.perf_counter() - inicio, resultado
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        conn = banco_temporario(diretorio, "linha.db")
+        submissoes = gerar_submissoes(conn, n)
+        tempo = bench_linha_a_linha(conn, submissoes)
+        print(f"row by row        : {len(submissoes) / tempo:10.0f} rows/s ({tempo:.2f}s)")
+        conn.close()
+
+        for tamanho_lote in [100, 500, 2000]:
+            conn = banco_temporario(diretorio, f"lote{tamanho_lote}.db")
+            tempo, resultado = bench_ingestor(conn, submissoes, tamanho_lote)
+            print(
+                f"batched ({tamanho_lote:>4} rows): {len(submissoes) / tempo:10.0f} rows/s ({tempo:.2f}s) "
+                f"inserted={resultado['inseridas']} duplicates={resultado['duplicadas']} "
+                f"rejected={len(resultado['rejeitadas'])}"
+            )
+            conn.close()
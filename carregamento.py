@@ -0,0 +1,136 @@
+"""Loading of the scouting dataset.
+
+carregar_consulta_unica runs the original single JOIN on one connection.
+carregar_particionado splits the score rows by challenge_id or by scores_tb id range
+and fetches the partitions concurrently on a thread pool, one connection per worker.
+The small dimension tables (challenge_tb, challenge_phases_tb) are fetched once and
+joined locally."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from banco_local import marcador
+
+# Columns and joins shared by every scouting data query
+SCORES_SELECT = """
+    SELECT
+        r.id as robot_id,
+        r.team,
+        c.id as challenge_id,
+        c.name as challenge_name,
+        cp.id as phase_id,
+        cp.name as phase_name,
+        s.completed_autonomous,
+        s.completed_teleop,
+        r.location,
+        r.alliance{extra_columns}
+    FROM scores_tb s
+    JOIN robots_tb r ON s.robot_id = r.id
+    JOIN challenge_tb c ON s.challenge_id = c.id
+    JOIN challenge_phases_tb cp ON s.phase_id = cp.id
+    """
+
+# Partition query: fact rows joined with robots only; dimensions are joined locally
+PARTITION_SELECT = """
+    SELECT
+        r.id as robot_id,
+        r.team,
+        s.challenge_id,
+        s.phase_id,
+        s.completed_autonomous,
+        s.completed_teleop,
+        r.location,
+        r.alliance{extra_columns}
+    FROM scores_tb s
+    JOIN robots_tb r ON s.robot_id = r.id
+    WHERE {filtro}
+    """
+
+COLUNAS = [
+    'robot_id', 'team', 'challenge_id', 'challenge_name', 'phase_id', 'phase_name',
+    'completed_autonomous', 'completed_teleop', 'location', 'alliance'
+]
+
+PARTICIONAMENTOS = ['challenge', 'id']
+
+def carregar_consulta_unica(conn, evento=None):
+    """All score rows (optionally of one event) in one monolithic query"""
+    if evento is None:
+        return pd.read_sql(SCORES_SELECT.format(extra_columns=""), conn)
+
+    m = marcador(conn)
+    query = SCORES_SELECT.format(extra_columns=",\n        r.event") + f"WHERE r.event = {m}\n"
+    return pd.read_sql(query, conn, params=(evento,))
+
+def _particoes(conn, particionar_por, n_particoes, limite, desafios):
+    """(filter, params) of every partition, none reaching past scores_tb id `limite`"""
+    m = marcador(conn)
+    cursor = conn.cursor()
+
+    # From the small challenge_tb frame: listing the ids in scores_tb would be a serial
+    # scan of the fact table before any parallel work starts
+    if particionar_por == 'challenge':
+        return [
+            (f"s.challenge_id = {m} AND s.id <= {m}", [int(challenge_id), limite])
+            for challenge_id in desafios['challenge_id']
+        ]
+
+    if particionar_por == 'id':
+        cursor.execute("SELECT MIN(id) FROM scores_tb")
+        menor = cursor.fetchone()[0]
+        passo = (limite - menor) // n_particoes + 1
+        return [
+            (f"s.id BETWEEN {m} AND {m}", [inicio, min(inicio + passo - 1, limite)])
+            for inicio in range(menor, limite + 1, passo)
+        ]
+
+    raise ValueError(f"Unknown partitioning: {particionar_por}")
+
+def _carregar_particao(conectar, filtro, params, evento):
+    conn = conectar()
+    try:
+        m = marcador(conn)
+        extra_columns = ""
+        if evento is not None:
+            extra_columns = ",\n        r.event"
+            filtro += f" AND r.event = {m}"
+            params = params + [evento]
+        return pd.read_sql(PARTITION_SELECT.format(extra_columns=extra_columns, filtro=filtro), conn, params=params)
+    finally:
+        conn.close()
+
+def carregar_particionado(conectar, evento=None, paralelismo=4, particionar_por='challenge', n_particoes=None):
+    """Same rows as carregar_consulta_unica, fetched as concurrent partitions.
+
+    conectar is a connection factory; every worker opens its own connection.
+    particionar_por is 'challenge' (one partition per challenge_id) or 'id' (n_particoes
+    equal scores_tb id ranges, default one per worker)."""
+    conn = conectar()
+    try:
+        desafios = pd.read_sql("SELECT id as challenge_id, name as challenge_name FROM challenge_tb", conn)
+        fases = pd.read_sql("SELECT id as phase_id, name as phase_name FROM challenge_phases_tb", conn)
+        # Read once so every partition sees the same snapshot of an append-only scores_tb
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(id) FROM scores_tb")
+        limite = cursor.fetchone()[0]
+        particoes = [] if limite is None else _particoes(
+            conn, particionar_por, n_particoes or paralelismo, limite, desafios
+        )
+    finally:
+        conn.close()
+
+    with ThreadPoolExecutor(max_workers=paralelismo) as executor:
+        partes = list(executor.map(
+            lambda particao: _carregar_particao(conectar, particao[0], particao[1], evento),
+            particoes
+        ))
+
+    # Empty partitions (e.g. id ranges outside the event) would degrade the dtypes
+    partes = [parte for parte in partes if not parte.empty]
+    colunas = COLUNAS + (['event'] if evento is not None else [])
+    if not partes:
+        return pd.DataFrame(columns=colunas)
+
+    df = pd.concat(partes, ignore_index=True)
+    df = df.merge(desafios, on='challenge_id').merge(fases, on='phase_id')
+    return df[colunas]
@@ -0,0 +1,74 @@
+"""Joint evaluation of every partner pair for a selected team.
+
+The combined coverage of an alliance is the sum, over every (challenge, phase), of the
+best points any of its three teams scores there. For a selected team, the coverage of
+all (partner A, partner B) pairs is computed in one broadcast over the team × phase
+matrix, so the whole field is ranked at once instead of filling the weakest
+challenges one at a time."""
+import numpy as np
+import pandas as pd
+
+from pontuacao import matriz_equipe_fase
+
+class MatrizComplementos:
+    """Team × (challenge, phase) points, ready for batched pair evaluation"""
+
+    def __init__(self, df):
+        matriz, _ = matriz_equipe_fase(df)
+        self.equipes = list(matriz.index)
+        self.fases = list(matriz.columns)
+        self.pontos = matriz.to_numpy(dtype=float)
+        self._posicao = {equipe: i for i, equipe in enumerate(self.equipes)}
+
+    def ranquear_pares(self, equipe, top_n=10, candidatos=None):
+        """Top-N partner pairs for `equipe` by combined phase coverage.
+
+        Returns a DataFrame with partner_a, partner_b, the trio's coverage points, the
+        gain over the selected team alone, and how many coverage points each member
+        supplies (ties go to the selected team, then to partner A)."""
+        base = self.pontos[self._posicao[equipe]]
+        if candidatos is None:
+            candidatos = [outra for outra in self.equipes if outra != equipe]
+        else:
+            candidatos = [outra for outra in candidatos if outra != equipe and outra in self._posicao]
+        if len(candidatos) < 2:
+            return pd.DataFrame(columns=[
+                'partner_a', 'partner_b', 'coverage_points', 'gain',
+                'points_selected', 'points_a', 'points_b'
+            ])
+
+        # Each candidate's row already merged with the selected team: (C, P)
+        com_base = np.maximum(self.pontos[[self._posicao[outra] for outra in candidatos]], base)
+        a, b = np.triu_indices(len(candidatos), k=1)
+        cobertura = np.maximum(com_base[a], com_base[b]).sum(axis=1)
+
+        melhores = np.argsort(-cobertura, kind='stable')[:top_n]
+        a, b = a[melhores], b[melhores]
+
+        # Per-pair breakdown of who supplies the best points in each phase
+        pontos_a = self.pontos[[self._posicao[candidatos[i]] for i in a]]
+        pontos_b = self.pontos[[self._posicao[candidatos[i]] for i in b]]
+        trio = np.stack([np.broadcast_to(base, pontos_a.shape), pontos_a, pontos_b])
+        melhor = trio.max(axis=0)
+        fornecedor = trio.argmax(axis=0)
+
+        return pd.DataFrame({
+            'partner_a': [candidatos[i] for i in a],
+            'partner_b': [candidatos[i] for i in b],
+            'coverage_points': cobertura[melhores],
+            'gain': cobertura[melhores] - base.sum(),
+            'points_selected': np.where(fornecedor == 0, melhor, 0).sum(axis=1),
+            'points_a': np.where(fornecedor == 1, melhor, 0).sum(axis=1),
+            'points_b': np.where(fornecedor == 2, melhor, 0).sum(axis=1),
+        })
+
+    def detalhar(self, alianca):
+        """Best points per (challenge, phase) of an alliance and which team supplies them"""
+        pontos = self.pontos[[self._posicao[equipe] for equipe in alianca]]
+        fornecedor = pontos.argmax(axis=0)
+        return pd.DataFrame({
+            'challenge_name': [desafio for desafio, _ in self.fases],
+            'phase_name': [fase for _, fase in self.fases],
+            'total_points': pontos.max(axis=0),
+            'team': [alianca[i] for i in fornecedor],
+        })
@@ -1,10 +1,24 @@
 import streamlit as st
 import pandas as pd
 import mysql.connector
+from mysql.connector import errorcode
 import plotly.express as px
 import plotly.graph_objects as go
 import io
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+
+from agregacao import carregar_resumos, resumir_fases
+from carregamento import carregar_consulta_unica, carregar_particionado
+from complemento import MatrizComplementos
+from historico import HistoricoRankings
+from ingestao import IngestorScouting, ler_submissoes
+from pontuacao import calcular_pontos, agregar_rankings
+from selecao import ModeloDraft
+from simulacao import construir_distribuicoes, simular_partidas
+from similaridade import IndiceSimilaridade, METRICAS
+from tendencias import MotorTendencias, MODOS
 
 # Page configuration
 st.set_page_config(
@@ -12,19 +26,6 @@ st.set_page_config(
     page_icon="🤖",
     layout="wide"
 )
-# Point mapping
-POINTS_MAP = {
-    'LEAVE': {'auto': 3, 'teleop': 0},
-    'L1': {'auto': 3, 'teleop': 2},      # CORAL L1
-    'L2': {'auto': 4, 'teleop': 3},      # CORAL L2
-    'L3': {'auto': 6, 'teleop': 4},      # CORAL L3
-    'L4': {'auto': 7, 'teleop': 5},      # CORAL L4
-    'PROCESSOR': {'auto': 6, 'teleop': 6},
-    'NET': {'auto': 4, 'teleop': 4},
-    'PARK': {'auto': 0, 'teleop': 2},
-    'SHALLOW_CAGE': {'auto': 6, 'teleop': 6},
-    'DEEP_CAGE': {'auto': 12, 'teleop': 12}
-}
 
 def conectar_ao_banco():
     return mysql.connector.connect(
@@ -34,83 +35,57 @@ def conectar_ao_banco():
         database=st.secrets["DB_NAME"]
     )
 
-@st.cache_data(ttl=600)  # Increase cache time to 10 minutes
-def carregar_dados():
+# Directory where archived events are frozen as precomputed summaries
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".event_cache")
+
+@st.cache_data(ttl=600)
+def listar_eventos():
+    """Lists the events registered in robots_tb, oldest first (empty when the database has no event column)"""
     conn = conectar_ao_banco()
+    try:
+        cursor = conn.cursor()
+        # Entries are appended in id order, so the latest robot id dates each event
+        cursor.execute("SELECT event FROM robots_tb WHERE event IS NOT NULL GROUP BY event ORDER BY MAX(id)")
+        return [row[0] for row in cursor.fetchall()]
+    except mysql.connector.ProgrammingError as e:
+        # Only a missing column means "no event support"; connection errors must surface
+        if e.errno != errorcode.ER_BAD_FIELD_ERROR:
+            raise
+        return []
+    finally:
+        conn.close()
+
+def eventos_arquivados():
+    """Events listed in the ARCHIVED_EVENTS secret are finished and never re-queried"""
+    return set(st.secrets.get("ARCHIVED_EVENTS", []))
+
+@st.cache_data(ttl=600)  # Increase cache time to 10 minutes
+def carregar_dados(evento=None):
+    # Partitioned concurrent fetch when DB_PARALLELISM > 1 (see carregamento.py)
+    paralelismo = int(st.secrets.get("DB_PARALLELISM", 1))
+    if paralelismo > 1:
+        return carregar_particionado(
+            conectar_ao_banco,
+            evento,
+            paralelismo=paralelismo,
+            particionar_por=st.secrets.get("DB_PARTITION_BY", "challenge")
+        )
     
-    # Query to get all scores with robot and phase information
-    query = """
-    SELECT 
-        r.id as robot_id,
-        r.team,
-        c.id as challenge_id,
-        c.name as challenge_name,
-        cp.id as phase_id,
-        cp.name as phase_name,
-        s.completed_autonomous,
-        s.completed_teleop,
-        r.location,
-        r.alliance
-    FROM scores_tb s
-    JOIN robots_tb r ON s.robot_id = r.id
-    JOIN challenge_tb c ON s.challenge_id = c.id
-    JOIN challenge_phases_tb cp ON s.phase_id = cp.id
-    """
-    
-    # Load data into DataFrame
-    df = pd.read_sql(query, conn)
+    # Single query to get all scores with robot and phase information,
+    # scoped to a single event when one is given
+    conn = conectar_ao_banco()
+    df = carregar_consulta_unica(conn, evento)
     conn.close()
     
     return df
 
 @st.cache_data(ttl=600)
 def processar_dados(df):
-    # Transform phase_name to match POINTS_MAP keys if needed
-    phase_mapping = {
-        'CORAL L1': 'L1',
-        'CORAL L2': 'L2',
-        'CORAL L3': 'L3',
-        'CORAL L4': 'L4',
-        'BARGE': 'PARK'
-        # Add other mappings if necessary
-    }
-    df['phase_key'] = df['phase_name'].map(phase_mapping).fillna(df['phase_name'])
-    
-    # Calculate points - first create empty columns
-    df['auto_points'] = 0.0
-    df['teleop_points'] = 0.0
-    
-    # Vectorize operations where possible instead of looping
-    for phase, points in POINTS_MAP.items():
-        mask = df['phase_key'] == phase
-        df.loc[mask, 'auto_points'] = df.loc[mask, 'completed_autonomous'] * points['auto']
-        df.loc[mask, 'teleop_points'] = df.loc[mask, 'completed_teleop'] * points['teleop']
-    
-    # Calculate total points
-    df['total_points'] = df['auto_points'] + df['teleop_points']
-    
-    return df
+    return calcular_pontos(df)
 
 @st.cache_data(ttl=600)
 def calcular_rankings(df):
-    # Calculate team rankings
-    team_rankings = df.groupby('team').agg({
-        'auto_points': 'sum',
-        'teleop_points': 'sum',
-        'total_points': 'sum'
-    }).reset_index()
-    
-    team_rankings['rank'] = team_rankings['total_points'].rank(ascending=False, method='min').astype(int)
-    team_rankings = team_rankings.sort_values('rank')
-    
-    # Calculate challenge-specific rankings
-    challenge_rankings = df.groupby(['team', 'challenge_name']).agg({
-        'auto_points': 'sum',
-        'teleop_points': 'sum', 
-        'total_points': 'sum'
-    }).reset_index()
-    
-    return team_rankings, challenge_rankings
+    return agregar_rankings(df)
 
 @st.cache_data(ttl=600)
 def construir_alianca_otima(team_rankings, challenge_rankings, df_processed, tamanho_alianca=3, max_teams=30):
@@ -259,6 +234,229 @@ def construir_alianca_otima(team_rankings, challenge_rankings, df_processed, tam
     
     return aliances
 
+def _caminho_arquivo(evento, nome):
+    """Path of one frozen summary file of an archived event"""
+    evento_dir = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in str(evento))
+    return os.path.join(ARCHIVE_DIR, evento_dir, f"{nome}.parquet")
+
+@st.cache_resource
+def carregar_resumo_arquivado(evento):
+    """Loads the immutable summary of an archived event.
+    
+    The event is queried and processed only once; afterwards the processed scores and
+    rankings are read from disk and kept in memory for every session, without a TTL."""
+    nomes = ['df', 'team_rankings', 'challenge_rankings']
+    caminhos = {nome: _caminho_arquivo(evento, nome) for nome in nomes}
+    
+    if all(os.path.exists(caminho) for caminho in caminhos.values()):
+        return {nome: pd.read_parquet(caminho) for nome, caminho in caminhos.items()}
+    
+    df = processar_dados(carregar_dados(evento))
+    team_rankings, challenge_rankings = calcular_rankings(df)
+    resumo = {'df': df, 'team_rankings': team_rankings, 'challenge_rankings': challenge_rankings}
+    
+    try:
+        os.makedirs(os.path.dirname(caminhos['df']), exist_ok=True)
+        for nome, caminho in caminhos.items():
+            resumo[nome].to_parquet(caminho, index=False)
+    except OSError as e:
+        # Read-only deployments still keep the summary frozen in memory
+        print(f"Could not persist summary for event {evento}: {e}")
+    
+    return resumo
+
+@st.cache_data(ttl=600)
+def carregar_dados_agregados(evento=None):
+    """Reads only the server-side summary tables (see agregacao.py), optionally of one event"""
+    conn = conectar_ao_banco()
+    try:
+        return carregar_resumos(conn, evento)
+    finally:
+        conn.close()
+
+def carregar_eventos(eventos):
+    """Loads and processes the selected events, each one through its own cache entry.
+    
+    Returns the processed scores plus the team and challenge rankings."""
+    # Server-side aggregation mode reads the small summary tables only
+    agregado = st.secrets.get("AGGREGATED_MODE", False)
+    
+    if not eventos:
+        if agregado:
+            return carregar_dados_agregados()
+        df = processar_dados(carregar_dados())
+        return (df,) + calcular_rankings(df)
+    
+    arquivados = eventos_arquivados()
+    
+    # A single event is served entirely from its frozen or server-side summary
+    if len(eventos) == 1 and eventos[0] in arquivados:
+        resumo = carregar_resumo_arquivado(eventos[0])
+        return resumo['df'], resumo['team_rankings'], resumo['challenge_rankings']
+    if len(eventos) == 1 and agregado:
+        return carregar_dados_agregados(eventos[0])
+    
+    frames = []
+    for evento in eventos:
+        if evento in arquivados:
+            df_evento = carregar_resumo_arquivado(evento)['df']
+            # Summary rows have no robot entries, so archived rows are collapsed to match
+            frames.append(resumir_fases(df_evento) if agregado else df_evento)
+        elif agregado:
+            frames.append(carregar_dados_agregados(evento)[0])
+        else:
+            frames.append(processar_dados(carregar_dados(evento)))
+    
+    df = pd.concat(frames, ignore_index=True)
+    return (df,) + calcular_rankings(df)
+
+def importar_submissoes():
+    """Sidebar upload of offline tablet batches (see ingestao.py)"""
+    with st.sidebar.expander("Importar submissões"):
+        arquivo = st.file_uploader("Lote JSON ou CSV", type=['json', 'csv'])
+        if arquivo is not None and st.button("Importar"):
+            try:
+                # utf-8-sig drops the BOM of Excel exports; decode and JSON errors are ValueErrors
+                submissoes = ler_submissoes(arquivo.getvalue().decode('utf-8-sig'), arquivo.name.rsplit('.', 1)[-1].lower())
+            except ValueError as e:
+                st.error(f"Arquivo inválido: {e}")
+                return
+            
+            try:
+                conn = conectar_ao_banco()
+                try:
+                    # Summary tables maintained by the ingest job instead of triggers
+                    resultado = IngestorScouting(
+                        conn, atualizar_agregados=st.secrets.get("AGGREGATION_INGEST_JOB", False)
+                    ).ingerir(submissoes)
+                finally:
+                    conn.close()
+            except mysql.connector.Error as e:
+                st.error(f"Erro ao importar submissões: {e}")
+                return
+            
+            st.success(f"{resultado['inseridas']} inseridas, {resultado['duplicadas']} duplicadas")
+            if resultado['rejeitadas']:
+                st.warning(f"{len(resultado['rejeitadas'])} rejeitadas")
+                st.dataframe(pd.DataFrame(resultado['rejeitadas'], columns=['Submissão', 'Motivo']))
+            
+            # New rows must show up on the next run
+            if resultado['inseridas']:
+                st.cache_data.clear()
+
+@st.cache_data(ttl=600)
+def construir_distribuicoes_cache(df):
+    return construir_distribuicoes(df)
+
+@st.cache_resource
+def obter_pool_simulacao(processos):
+    """One worker pool for the simulator, reused across reruns and sessions"""
+    return ProcessPoolExecutor(max_workers=processos)
+
+def exibir_simulacao(df, alianca, oponentes, key):
+    """Monte Carlo comparison of an alliance against an opponent alliance"""
+    if 'robot_id' not in df:
+        st.info("Simulação indisponível no modo agregado (sem dados por entrada de robô).")
+        return
+    
+    n_simulacoes = st.select_slider(
+        "Partidas simuladas:",
+        options=[5000, 20000, 50000],
+        value=20000,
+        key=f"{key}_n"
+    )
+    processos = int(st.secrets.get("SIMULATION_PROCESSES", 1))
+    resultado = simular_partidas(
+        construir_distribuicoes_cache(df),
+        alianca,
+        oponentes,
+        n_simulacoes=n_simulacoes,
+        seed=0,
+        processos=processos,
+        executor=obter_pool_simulacao(processos) if processos > 1 else None
+    )
+    
+    cols = st.columns(3)
+    with cols[0]:
+        st.metric("Vitória", f"{resultado['prob_vitoria_a']:.1%}")
+    with cols[1]:
+        st.metric("Empate", f"{resultado['prob_empate']:.1%}")
+    with cols[2]:
+        st.metric("Derrota", f"{resultado['prob_vitoria_b']:.1%}")
+    
+    # Score quantiles of both alliances
+    quantis = pd.DataFrame(
+        [resultado['quantis_a'], resultado['quantis_b']],
+        index=[" / ".join(alianca), " / ".join(oponentes)]
+    ).rename(columns=lambda q: f"P{int(q * 100)}")
+    quantis['Média'] = [resultado['media_a'], resultado['media_b']]
+    st.dataframe(quantis.round(1), use_container_width=True)
+
+@st.cache_data(ttl=600)
+def construir_modelo_draft(df, team_rankings):
+    return ModeloDraft(df, team_rankings)
+
+def tabela_aliancas(aliancas):
+    """One row per alliance, captain first"""
+    return pd.DataFrame({
+        'Aliança': [i + 1 for i in range(len(aliancas))],
+        'Capitão': [alianca[0] for alianca in aliancas],
+        'Escolhas': [" / ".join(alianca[1:]) for alianca in aliancas]
+    })
+
+@st.cache_data(ttl=600)
+def construir_indice_similaridade(df):
+    return IndiceSimilaridade(df)
+
+@st.cache_resource
+def obter_motor_tendencias(eventos):
+    """One incremental trend engine per event selection, shared by every session"""
+    return MotorTendencias()
+
+def aplicar_ponderacao(df, eventos):
+    """Sidebar switch between all-time sums and recent form (see tendencias.py).
+    
+    Returns the frame the rankings, alliance builders and tab 4 should use."""
+    ponderacao = st.sidebar.radio(
+        "Ponderação:",
+        options=['total'] + MODOS,
+        format_func=lambda m: {
+            'total': 'Histórico completo',
+            'janela': 'Forma recente (janela móvel)',
+            'ewma': 'Forma recente (média exponencial)'
+        }[m]
+    )
+    if ponderacao == 'total':
+        return df
+    
+    if 'robot_id' not in df:
+        st.sidebar.info("Forma recente indisponível no modo agregado.")
+        return df
+    
+    janela = st.sidebar.slider("Entradas na janela:", min_value=2, max_value=15, value=5)
+    alpha = st.sidebar.slider("Peso da entrada mais recente:", min_value=0.05, max_value=0.9, value=0.3, step=0.05)
+    
+    motor = obter_motor_tendencias(tuple(eventos))
+    motor.atualizar(df, janela, alpha)
+    return motor.como_dataframe(ponderacao, janela, alpha)
+
+@st.cache_resource
+def obter_historico(eventos):
+    """Ranking history of one event selection, kept across refreshes and sessions"""
+    return HistoricoRankings()
+
+@st.cache_data(ttl=600)
+def construir_matriz_complementos(df):
+    return MatrizComplementos(df)
+
+def arredondar_pontos(tabela, colunas, forma_recente):
+    """Whole numbers for all-time sums; recent-form per-entry averages keep one decimal"""
+    for col in colunas:
+        tabela[col] = tabela[col].round(1) if forma_recente else tabela[col].astype(int)
+
+def formatar_pontos(valor, forma_recente):
+    return f"{valor:.1f}" if forma_recente else f"{int(valor)}"
+
 # Add this helper function for CSV export
 def convert_df_to_csv(df):
     """Converts a DataFrame to a CSV string for download."""
@@ -269,13 +467,34 @@ def convert_df_to_csv(df):
 def main():
     st.title("🤖 FRC REEFSCAPE Dashboard")
     
-    # Load and process data with progress indicators
+    importar_submissoes()
+    
+    # Event selection (only shown when the database tracks events)
+    eventos_disponiveis = listar_eventos()
+    eventos = []
+    if eventos_disponiveis:
+        eventos = st.sidebar.multiselect(
+            "Eventos:",
+            options=eventos_disponiveis,
+            default=eventos_disponiveis[-1:]  # the most recent event
+        )
+        if not eventos:
+            st.warning("Selecione ao menos um evento.")
+            st.stop()
+    
+    # Load, process and rank data with progress indicators
     with st.spinner("Carregando dados..."):
-        df = carregar_dados()
-        df = processar_dados(df)
+        df, team_rankings, challenge_rankings = carregar_eventos(eventos)
+    
+    # Every refresh of the all-time table is recorded as a delta snapshot
+    historico = obter_historico(tuple(eventos))
+    historico.registrar(team_rankings)
     
-    # Calculate rankings with caching
-    with st.spinner("Calculando rankings..."):
+    # Per-entry rows are kept for the match simulator
+    df_entries = df
+    df = aplicar_ponderacao(df, eventos)
+    forma_recente = df is not df_entries
+    if forma_recente:
         team_rankings, challenge_rankings = calcular_rankings(df)
     
     # Create tabs but defer heavy computation
@@ -300,9 +519,9 @@ def main():
         # Sort by rank
         display_rankings = display_rankings.sort_values('Classificação')
         
-        # Convert numeric columns to integers for cleaner display
-        for col in ['Pontos Totais', 'Pontos Autônomo', 'Pontos Teleoperado', 'Classificação']:
-            display_rankings[col] = display_rankings[col].astype(int)
+        # Whole numbers for cleaner display (one decimal for recent-form averages)
+        arredondar_pontos(display_rankings, ['Pontos Totais', 'Pontos Autônomo', 'Pontos Teleoperado'], forma_recente)
+        display_rankings['Classificação'] = display_rankings['Classificação'].astype(int)
         
         # Display the table
         st.dataframe(
@@ -337,6 +556,43 @@ def main():
         fig.update_yaxes(categoryorder='total ascending')
         
         st.plotly_chart(fig, use_container_width=True)
+        
+        # Ranking history (time-travel view and rank movement)
+        st.subheader("Histórico da Classificação")
+        if len(historico) < 2:
+            st.info("O histórico aparece após a próxima atualização dos dados.")
+        else:
+            snapshot_time = st.select_slider(
+                "Classificação em:",
+                options=historico.momentos,
+                value=historico.momentos[-1],
+                format_func=lambda m: m.strftime("%d/%m %H:%M")
+            )
+            past_rankings = historico.estado_em(snapshot_time)
+            st.dataframe(
+                past_rankings.rename(columns={
+                    'team': 'Equipe',
+                    'total_points': 'Pontos Totais',
+                    'auto_points': 'Pontos Autônomo',
+                    'teleop_points': 'Pontos Teleoperado',
+                    'rank': 'Classificação'
+                })[['Classificação', 'Equipe', 'Pontos Totais', 'Pontos Autônomo', 'Pontos Teleoperado']],
+                use_container_width=True,
+                hide_index=True
+            )
+            
+            movement = historico.movimentacao(team_rankings.head(10)['team'].tolist())
+            movement_fig = px.line(
+                movement,
+                x='momento',
+                y='rank',
+                color='team',
+                markers=True,
+                title="Movimentação das Top 10 Equipes",
+                labels={'momento': 'Horário', 'rank': 'Classificação', 'team': 'Equipe'}
+            )
+            movement_fig.update_yaxes(autorange='reversed')
+            st.plotly_chart(movement_fig, use_container_width=True)
     
     with tab2:
         st.header("Análise por Desafio")
@@ -374,9 +630,11 @@ def main():
                 'rank': 'Classificação'
             })
             
-            # Convert numeric columns to integers for cleaner display
-            for col in ['Pontos Totais', 'Pontos Autônomo', 'Pontos Teleoperado', 'Classificação']:
-                display_challenge_rankings[col] = display_challenge_rankings[col].astype(int)
+            # Whole numbers for cleaner display (one decimal for recent-form averages)
+            arredondar_pontos(
+                display_challenge_rankings, ['Pontos Totais', 'Pontos Autônomo', 'Pontos Teleoperado'], forma_recente
+            )
+            display_challenge_rankings['Classificação'] = display_challenge_rankings['Classificação'].astype(int)
             
             # Display the table
             st.dataframe(
@@ -402,7 +660,7 @@ def main():
                 with metrics_cols[col_index]:
                     st.metric(
                         f"{row['team']}",
-                        f"{int(row['total_points'])} pts",
+                        f"{formatar_pontos(row['total_points'], forma_recente)} pts",
                         f"Rank: {int(row['rank'])}"
                     )
 
@@ -489,6 +747,17 @@ def main():
         
         # Only do expensive calculations if a team is selected
         if selected_team:
+            complement_mode = st.radio(
+                "Modo de complemento:",
+                options=['desafios', 'pares'],
+                format_func=lambda m: {
+                    'desafios': 'Desafios mais fracos',
+                    'pares': 'Todos os pares de parceiros'
+                }[m],
+                horizontal=True,
+                key="complement_mode"
+            )
+            
             with st.spinner("Calculando alianças otimizadas..."):
                 # Get team's challenge performance
                 team_challenge_points = challenge_rankings[challenge_rankings['team'] == selected_team]
@@ -502,44 +771,79 @@ def main():
                 with cols[0]:
                     st.write("**Pontos Fortes:**")
                     for _, row in best_challenges.iterrows():
-                        st.write(f"- {row['challenge_name']}: {int(row['total_points'])} pts")
+                        st.write(f"- {row['challenge_name']}: {formatar_pontos(row['total_points'], forma_recente)} pts")
                 
                 with cols[1]:
                     st.write("**Pontos Fracos:**")
                     for _, row in worst_challenges.iterrows():
-                        st.write(f"- {row['challenge_name']}: {int(row['total_points'])} pts")
+                        st.write(f"- {row['challenge_name']}: {formatar_pontos(row['total_points'], forma_recente)} pts")
                 
-                # Simplified alliance building logic
-                # Start with the selected team
-                alliance = [selected_team]
+                if complement_mode == 'pares':
+                    # Every (partner A, partner B) pair evaluated jointly in one batched pass
+                    pair_ranking = construir_matriz_complementos(df).ranquear_pares(selected_team, top_n=10)
+                    alliance = [selected_team]
+                    if not pair_ranking.empty:
+                        alliance += [pair_ranking.iloc[0]['partner_a'], pair_ranking.iloc[0]['partner_b']]
+                    
+                    st.write("### Melhores Pares de Parceiros")
+                    st.dataframe(
+                        pair_ranking.rename(columns={
+                            'partner_a': 'Parceiro A',
+                            'partner_b': 'Parceiro B',
+                            'coverage_points': 'Cobertura Total',
+                            'gain': 'Ganho',
+                            'points_selected': f'Pontos de {selected_team}',
+                            'points_a': 'Pontos de A',
+                            'points_b': 'Pontos de B'
+                        }).round(1),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                    
+                    # Breakdown of the best pair: which team covers each phase
+                    if len(alliance) == alliance_size:
+                        pair_breakdown = construir_matriz_complementos(df).detalhar(alliance)
+                        fig = px.bar(
+                            pair_breakdown,
+                            x='phase_name',
+                            y='total_points',
+                            color='team',
+                            title="Melhor Pontuação por Fase e Equipe Responsável",
+                            labels={'phase_name': 'Fase', 'total_points': 'Pontos Totais', 'team': 'Equipe'}
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+                else:
+                    # Simplified alliance building logic
+                    # Start with the selected team
+                    alliance = [selected_team]
                 
-                # For each weak challenge, find a strong team
-                for _, challenge_row in worst_challenges.iterrows():
-                    if len(alliance) >= alliance_size:
-                        break
+                    # For each weak challenge, find a strong team
+                    for _, challenge_row in worst_challenges.iterrows():
+                        if len(alliance) >= alliance_size:
+                            break
                         
-                    challenge = challenge_row['challenge_name']
+                        challenge = challenge_row['challenge_name']
                     
-                    # Find strong teams in this challenge
-                    strong_teams = challenge_rankings[
-                        (challenge_rankings['challenge_name'] == challenge) & 
-                        ~(challenge_rankings['team'].isin(alliance))
-                    ].sort_values('total_points', ascending=False).head(5)  # Limit to top 5
+                        # Find strong teams in this challenge
+                        strong_teams = challenge_rankings[
+                            (challenge_rankings['challenge_name'] == challenge) & 
+                            ~(challenge_rankings['team'].isin(alliance))
+                        ].sort_values('total_points', ascending=False).head(5)  # Limit to top 5
                     
-                    if not strong_teams.empty:
-                        best_team = strong_teams.iloc[0]['team']
-                        alliance.append(best_team)
+                        if not strong_teams.empty:
+                            best_team = strong_teams.iloc[0]['team']
+                            alliance.append(best_team)
                 
-                # If alliance still not complete, add highest scoring available teams
-                while len(alliance) < alliance_size:
-                    remaining = team_rankings[
-                        ~team_rankings['team'].isin(alliance)
-                    ].sort_values('total_points', ascending=False).head(5)  # Limit to top 5
+                    # If alliance still not complete, add highest scoring available teams
+                    while len(alliance) < alliance_size:
+                        remaining = team_rankings[
+                            ~team_rankings['team'].isin(alliance)
+                        ].sort_values('total_points', ascending=False).head(5)  # Limit to top 5
                     
-                    if remaining.empty:
-                        break
+                        if remaining.empty:
+                            break
                         
-                    alliance.append(remaining.iloc[0]['team'])
+                        alliance.append(remaining.iloc[0]['team'])
                 
                 # Calculate alliance total points
                 alliance_points = team_rankings[team_rankings['team'].isin(alliance)]['total_points'].sum()
@@ -579,11 +883,11 @@ def main():
                             st.markdown(f"""
                             **Melhor Desafio:** {best_challenge['challenge_name']}
                             - *Melhor Fase:* {best_phase['phase_name']}
-                            - *Pontos:* {int(best_phase['total_points'])}
+                            - *Pontos:* {formatar_pontos(best_phase['total_points'], forma_recente)}
                             """)
                 
                 # Show total alliance points
-                st.metric("Pontuação Total da Aliança", f"{int(alliance_points)} pontos")
+                st.metric("Pontuação Total da Aliança", f"{formatar_pontos(alliance_points, forma_recente)} pontos")
                 
                 # Simplified challenge coverage visualization
                 st.subheader("Cobertura de Desafios da Aliança")
@@ -602,6 +906,19 @@ def main():
                     labels={'challenge_name': 'Desafio', 'total_points': 'Pontos Totais'}
                 )
                 st.plotly_chart(fig, use_container_width=True)
+                
+                # Simulate the complementary alliance against an opponent alliance
+                st.subheader("Simulação de Partidas")
+                opponent_options = [team for team in team_rankings['team'] if team not in alliance]
+                opponents = st.multiselect(
+                    "Aliança adversária:",
+                    options=opponent_options,
+                    default=opponent_options[:alliance_size],
+                    max_selections=alliance_size,
+                    key="sim_opponents"
+                )
+                if opponents:
+                    exibir_simulacao(df_entries, alliance, opponents, key="sim_selected_team")
         
         else:
             # Show a maximum of 3 pre-computed alliances to avoid performance issues
@@ -612,7 +929,7 @@ def main():
                 
                 # Only show top 3 alliances
                 for i, alliance in enumerate(alliances[:3]):
-                    st.markdown(f"### Aliança {i+1} - {int(alliance['total_points'])} pontos")
+                    st.markdown(f"### Aliança {i+1} - {formatar_pontos(alliance['total_points'], forma_recente)} pontos")
                     
                     # Show teams in horizontal columns
                     team_cols = st.columns(len(alliance['teams']))
@@ -647,7 +964,7 @@ def main():
                                 st.markdown(f"""
                                 **Melhor Desafio:** {best_challenge['challenge_name']}
                                 - *Melhor Fase:* {best_phase['phase_name']}
-                                - *Pontos:* {int(best_phase['total_points'])}
+                                - *Pontos:* {formatar_pontos(best_phase['total_points'], forma_recente)}
                                 """)
                     
                     # Show phase coverage visualization
@@ -680,6 +997,55 @@ def main():
                         st.plotly_chart(fig, use_container_width=True)
                     
                     st.markdown("---")  # Add a separator between alliances
+                
+                # Head-to-head simulation between two of the suggested alliances
+                if len(alliances) >= 2:
+                    st.subheader("Simulação entre Alianças")
+                    alliance_labels = [f"Aliança {i+1}: {' / '.join(a['teams'])}" for i, a in enumerate(alliances)]
+                    sim_cols = st.columns(2)
+                    with sim_cols[0]:
+                        index_a = st.selectbox("Aliança:", range(len(alliances)), format_func=lambda i: alliance_labels[i], index=0, key="sim_alliance_a")
+                    with sim_cols[1]:
+                        index_b = st.selectbox("Adversária:", range(len(alliances)), format_func=lambda i: alliance_labels[i], index=1, key="sim_alliance_b")
+                    
+                    if index_a != index_b:
+                        exibir_simulacao(df_entries, alliances[index_a]['teams'], alliances[index_b]['teams'], key="sim_alliances")
+        
+        # Full serpentine alliance selection with declines
+        st.subheader("Simulação do Draft")
+        draft_model = construir_modelo_draft(df, team_rankings)
+        
+        draft_cols = st.columns(2)
+        with draft_cols[0]:
+            strategy = st.selectbox(
+                "Estratégia de escolha:",
+                options=ModeloDraft.ESTRATEGIAS,
+                format_func=lambda e: {'sinergia': 'Sinergia', 'pontos': 'Pontos Totais', 'mista': 'Mista'}[e],
+                key="draft_strategy"
+            )
+        with draft_cols[1]:
+            declines = st.multiselect(
+                "Equipes que recusam convite:",
+                options=draft_model.equipes,
+                default=[],
+                key="draft_declines"
+            )
+        
+        draft = draft_model.simular(strategy, declines)
+        st.dataframe(tabela_aliancas(draft['aliancas']), use_container_width=True, hide_index=True)
+        
+        # What-if branches: each picked team declining its invitation
+        with st.expander("Cenários de recusa"):
+            followed_team = selected_team or draft['aliancas'][0][0]
+            scenarios = []
+            for declining_team, branch in draft_model.explorar_recusas(draft).items():
+                followed_alliance = next((a for a in branch['aliancas'] if followed_team in a), [])
+                scenarios.append({
+                    'Equipe que recusa': declining_team,
+                    f'Aliança de {followed_team}': " / ".join(followed_alliance) if followed_alliance else "Não selecionada",
+                    'Alianças alteradas': sum(a != b for a, b in zip(branch['aliancas'], draft['aliancas']))
+                })
+            st.dataframe(pd.DataFrame(scenarios), use_container_width=True, hide_index=True)
 
     with tab4:
         st.header("Estatísticas de Robôs")
@@ -706,10 +1072,11 @@ def main():
             with col1:
                 st.metric("Classificação Geral", f"{int(robot_rank)}º")
             with col2:
-                st.metric("Pontuação Total", f"{int(robot_total_points)} pts")
+                st.metric("Pontuação Total", f"{formatar_pontos(robot_total_points, forma_recente)} pts")
             with col3:
                 # Get robot's alliance
-                alliance = robot_data['alliance'].iloc[0] if not robot_data.empty else "N/A"
+                # (summary tables have no per-entry alliance)
+                alliance = robot_data['alliance'].iloc[0] if 'alliance' in robot_data and not robot_data.empty else "N/A"
                 st.metric("Aliança", alliance.upper() if isinstance(alliance, str) else "N/A")
             
             # Calculate performance by challenge
@@ -724,7 +1091,7 @@ def main():
                 best_challenge = challenge_performance.loc[challenge_performance['total_points'].idxmax()]
                 
                 st.subheader("Melhor Desafio")
-                st.info(f"**{best_challenge['challenge_name']}** com **{int(best_challenge['total_points'])}** pontos")
+                st.info(f"**{best_challenge['challenge_name']}** com **{formatar_pontos(best_challenge['total_points'], forma_recente)}** pontos")
                 
                 # Show detailed phase performance
                 st.subheader("Desempenho por Fase")
@@ -750,10 +1117,9 @@ def main():
                     'completed_teleop': 'Completados Teleoperado'
                 })
                 
-                # Convert numeric columns to integers for cleaner display
-                for col in ['Pontos Totais', 'Pontos Autônomo', 'Pontos Teleoperado', 
-                           'Completados Autônomo', 'Completados Teleoperado']:
-                    phase_display[col] = phase_display[col].astype(int)
+                # Whole numbers for cleaner display (one decimal for recent-form averages)
+                arredondar_pontos(phase_display, ['Pontos Totais', 'Pontos Autônomo', 'Pontos Teleoperado', 
+                                                  'Completados Autônomo', 'Completados Teleoperado'], forma_recente)
                 
                 # Display the table
                 st.dataframe(
@@ -771,14 +1137,43 @@ def main():
             else:
                 st.warning(f"Não há dados de desempenho disponíveis para {selected_robot}")
         
+        # Find robots with a similar phase profile (e.g. to replace a lost pick)
+        st.subheader("Encontrar Robôs Similares")
+        similar_cols = st.columns(3)
+        with similar_cols[0]:
+            reference_robot = st.selectbox("Robô de referência:", [""] + robots, key="similar_reference")
+        with similar_cols[1]:
+            metric = st.radio(
+                "Métrica:",
+                options=METRICAS,
+                format_func=lambda m: {'cosseno': 'Cosseno', 'euclidiana': 'Euclidiana'}[m],
+                horizontal=True,
+                key="similar_metric"
+            )
+        with similar_cols[2]:
+            top_k = st.slider("Quantidade:", min_value=1, max_value=10, value=3, key="similar_k")
+        
+        similar_robots = []
+        if reference_robot:
+            similar = construir_indice_similaridade(df).buscar(reference_robot, k=top_k, metrica=metric)
+            similar_robots = similar['team'].tolist()
+            st.dataframe(
+                similar.rename(columns={
+                    'team': 'Robô',
+                    'score': 'Similaridade' if metric == 'cosseno' else 'Distância'
+                }).round(3),
+                use_container_width=True,
+                hide_index=True
+            )
+        
         # Add a section to compare robots
         st.subheader("Comparar Robôs")
         
-        # Multi-select for robots
+        # Multi-select for robots (pre-filled with the similar robots, if any)
         selected_robots = st.multiselect(
             "Selecione robôs para comparar:",
             options=robots,
-            default=[]
+            default=[reference_robot] + similar_robots if reference_robot else []
         )
         
         if selected_robots:
@@ -851,9 +1246,9 @@ def main():
                 'rank': 'Classificação'
             })
             
-            # Convert numeric columns to integers for cleaner display
-            for col in ['Pontos Totais', 'Pontos Autônomo', 'Pontos Teleoperado', 'Classificação']:
-                compare_summary[col] = compare_summary[col].astype(int)
+            # Whole numbers for cleaner display (one decimal for recent-form averages)
+            arredondar_pontos(compare_summary, ['Pontos Totais', 'Pontos Autônomo', 'Pontos Teleoperado'], forma_recente)
+            compare_summary['Classificação'] = compare_summary['Classificação'].astype(int)
             
             # Display the table
             st.dataframe(
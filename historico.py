@@ -0,0 +1,127 @@
+"""Compact history of the team rankings across an event.
+
+Each refresh records the ranking table as a delta against the previous snapshot: only
+the teams whose rank or points changed, plus the teams that disappeared. Every
+`intervalo_completo` snapshots a full copy is kept so that reconstructing any past
+table replays a bounded number of deltas. When more than `max_snapshots` are held, the
+oldest ones are folded into the next snapshot, which keeps memory bounded over
+multi-day events."""
+import bisect
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+COLUNAS_HISTORICO = ['rank', 'auto_points', 'teleop_points', 'total_points']
+
+class HistoricoRankings:
+    """Delta-encoded ranking snapshots with point-in-time reconstruction"""
+
+    def __init__(self, max_snapshots=500, intervalo_completo=20):
+        self.max_snapshots = max_snapshots
+        self.intervalo_completo = intervalo_completo
+        self._momentos = []
+        self._snapshots = []  # {'delta': {team: values}, 'removidos': set, 'completo': dict or None}
+        self._atual = {}
+        self._desde_completo = 0  # deltas stored since the last full copy
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    @property
+    def momentos(self):
+        return list(self._momentos)
+
+    @staticmethod
+    def _como_estado(team_rankings):
+        valores = team_rankings[COLUNAS_HISTORICO].to_numpy(dtype=float)
+        return {team: tuple(linha) for team, linha in zip(team_rankings['team'], valores)}
+
+    def registrar(self, team_rankings, momento=None):
+        """Records the table if anything changed since the last snapshot.
+
+        Returns True when a snapshot was stored."""
+        estado = self._como_estado(team_rankings)
+        momento = momento or datetime.now()
+
+        with self._lock:
+            delta = {team: valores for team, valores in estado.items() if self._atual.get(team) != valores}
+            removidos = set(self._atual) - set(estado)
+            if self._snapshots and not delta and not removidos:
+                return False
+
+            # Counted since the last full copy: the list length stops growing once
+            # compaction holds it at max_snapshots
+            completo = None
+            if not self._snapshots or self._desde_completo >= self.intervalo_completo - 1:
+                completo = estado
+                self._desde_completo = 0
+            else:
+                self._desde_completo += 1
+            self._snapshots.append({'delta': delta, 'removidos': removidos, 'completo': completo})
+            self._momentos.append(momento)
+            self._atual = estado
+
+            if len(self._snapshots) > self.max_snapshots:
+                self._compactar()
+        return True
+
+    def _compactar(self):
+        """Drops the oldest snapshot, turning the next one into a full copy"""
+        self._snapshots[1]['completo'] = self._reconstruir(1)
+        del self._snapshots[0]
+        del self._momentos[0]
+
+    def _reconstruir(self, indice):
+        """Ranking state at snapshot `indice`, replayed from the nearest full copy"""
+        inicio = indice
+        while self._snapshots[inicio]['completo'] is None:
+            inicio -= 1
+
+        estado = dict(self._snapshots[inicio]['completo'])
+        for snapshot in self._snapshots[inicio + 1:indice + 1]:
+            for team in snapshot['removidos']:
+                estado.pop(team, None)
+            estado.update(snapshot['delta'])
+        return estado
+
+    def _como_tabela(self, estado):
+        tabela = pd.DataFrame(
+            [(team,) + valores for team, valores in estado.items()],
+            columns=['team'] + COLUNAS_HISTORICO
+        )
+        tabela['rank'] = tabela['rank'].astype(int)
+        return tabela.sort_values('rank')
+
+    def estado_em(self, momento):
+        """The ranking table as it was at `momento` (None before the first snapshot)"""
+        with self._lock:
+            indice = bisect.bisect_right(self._momentos, momento) - 1
+            if indice < 0:
+                return None
+            return self._como_tabela(self._reconstruir(indice))
+
+    def movimentacao(self, equipes=None):
+        """Rank and points of each team at every snapshot, in long format for charts"""
+        linhas = []
+        with self._lock:
+            if not self._snapshots:
+                return pd.DataFrame(columns=['momento', 'team'] + COLUNAS_HISTORICO)
+
+            estado = dict(self._reconstruir(0))
+            for momento, snapshot in zip(self._momentos, self._snapshots):
+                if snapshot['completo'] is not None:
+                    estado = dict(snapshot['completo'])
+                else:
+                    for team in snapshot['removidos']:
+                        estado.pop(team, None)
+                    estado.update(snapshot['delta'])
+
+                for team, valores in estado.items():
+                    if equipes is None or team in equipes:
+                        linhas.append((momento, team) + valores)
+
+        movimentacao = pd.DataFrame(linhas, columns=['momento', 'team'] + COLUNAS_HISTORICO)
+        movimentacao['rank'] = movimentacao['rank'].astype(int)
+        return movimentacao
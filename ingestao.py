@@ -0,0 +1,221 @@
+"""Bulk ingestion of offline scouting submissions into scores_tb.
+
+Tablets sync in bursts after being offline, so submissions arrive in batches (JSON or
+CSV). Each submission is one score row:
+
+    submission_key, robot_id, challenge, phase, completed_autonomous, completed_teleop
+
+where challenge and phase may be given by id or by name. Submissions are validated
+against robots_tb, challenge_tb and challenge_phases_tb using cached id lookups (a
+phase must belong to the given challenge), deduplicated by submission_key (within the
+batch and against submissions_tb) and written with multi-row INSERTs inside a single
+transaction."""
+import csv
+import io
+import json
+
+import pandas as pd
+
+from agregacao import atualizar_resumos
+from banco_local import marcador
+
+CAMPOS_SUBMISSAO = ['submission_key', 'robot_id', 'challenge', 'phase', 'completed_autonomous', 'completed_teleop']
+
+def ler_submissoes(conteudo, formato):
+    """Parses a batch of submissions from JSON or CSV text into a list of dicts.
+
+    JSON may be a list of objects or an object with a "submissions" list. Malformed
+    input raises ValueError."""
+    if formato == 'json':
+        dados = json.loads(conteudo)
+        if isinstance(dados, dict):
+            dados = dados.get('submissions', [])
+        if not isinstance(dados, list):
+            raise ValueError("JSON batch must be a list of submissions")
+        return dados
+    if formato == 'csv':
+        try:
+            return list(csv.DictReader(io.StringIO(conteudo)))
+        except csv.Error as e:
+            raise ValueError(f"Malformed CSV batch: {e}") from e
+    raise ValueError(f"Unsupported submission format: {formato}")
+
+def ler_arquivo(caminho):
+    """Reads a .json or .csv batch file"""
+    formato = caminho.rsplit('.', 1)[-1].lower()
+    with open(caminho, encoding='utf-8-sig') as f:
+        return ler_submissoes(f.read(), formato)
+
+class IngestorScouting:
+    """Validates and writes submission batches, caching the dimension lookups between batches"""
+
+    def __init__(self, conn, tamanho_lote=500, atualizar_agregados=False):
+        self.conn = conn
+        self.tamanho_lote = tamanho_lote
+        # Fold new rows into the summary tables (ingest-job mode of agregacao.py)
+        self.atualizar_agregados = atualizar_agregados
+        self._robos = None
+        self._desafios = None
+        self._fases = None
+        self._pares = None
+        self._fases_com_desafio = None
+        self._criar_tabela_submissoes()
+
+    def _criar_tabela_submissoes(self):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS submissions_tb ("
+            "submission_key VARCHAR(100) NOT NULL PRIMARY KEY, "
+            "robot_id INTEGER NOT NULL)"
+        )
+        self.conn.commit()
+
+    def _carregar_lookups(self):
+        """(Re)loads the id caches of the dimension tables"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id FROM robots_tb")
+        self._robos = {row[0] for row in cursor.fetchall()}
+        cursor.execute("SELECT id, name FROM challenge_tb")
+        self._desafios = self._indexar(cursor.fetchall())
+        cursor.execute("SELECT id, name FROM challenge_phases_tb")
+        self._fases = self._indexar(cursor.fetchall())
+        # challenge_phases_tb does not name its challenge; the recorded pairs do
+        cursor.execute("SELECT DISTINCT challenge_id, phase_id FROM scores_tb")
+        self._pares = {(challenge_id, phase_id) for challenge_id, phase_id in cursor.fetchall()}
+        self._fases_com_desafio = {phase_id for _, phase_id in self._pares}
+
+    @staticmethod
+    def _indexar(linhas):
+        """Maps both ids (as text) and upper-cased names to ids"""
+        indice = {}
+        for id_, nome in linhas:
+            indice[str(id_)] = id_
+            indice[str(nome).strip().upper()] = id_
+        return indice
+
+    def _resolver(self, indice, valor):
+        return indice.get(str(valor).strip().upper())
+
+    @staticmethod
+    def _inteiro(valor):
+        """Integer value of a JSON number or CSV text, None for booleans, fractions and junk"""
+        if isinstance(valor, bool):
+            return None
+        if isinstance(valor, int):
+            return valor
+        if isinstance(valor, float):
+            return int(valor) if valor.is_integer() else None
+        texto = str(valor).strip()
+        if texto.lstrip('-').isdigit():
+            return int(texto)
+        return None
+
+    def _validar(self, submissao):
+        """Returns (row, None) for a valid submission or (None, reason) otherwise"""
+        if not isinstance(submissao, dict):
+            return None, "submission is not an object"
+        faltando = [campo for campo in CAMPOS_SUBMISSAO if submissao.get(campo) in (None, '')]
+        if faltando:
+            return None, f"missing fields: {', '.join(faltando)}"
+
+        robot_id = self._inteiro(submissao['robot_id'])
+        completed_autonomous = self._inteiro(submissao['completed_autonomous'])
+        completed_teleop = self._inteiro(submissao['completed_teleop'])
+        if robot_id is None or completed_autonomous is None or completed_teleop is None:
+            return None, "non-integer robot_id or completion count"
+        if completed_autonomous < 0 or completed_teleop < 0:
+            return None, "negative completion count"
+
+        if robot_id not in self._robos:
+            return None, f"unknown robot_id {robot_id}"
+        challenge_id = self._resolver(self._desafios, submissao['challenge'])
+        if challenge_id is None:
+            return None, f"unknown challenge {submissao['challenge']}"
+        phase_id = self._resolver(self._fases, submissao['phase'])
+        if phase_id is None:
+            return None, f"unknown phase {submissao['phase']}"
+        # A phase never recorded yet is accepted under any challenge
+        if phase_id in self._fases_com_desafio and (challenge_id, phase_id) not in self._pares:
+            return None, f"phase {submissao['phase']} does not belong to challenge {submissao['challenge']}"
+
+        return (robot_id, challenge_id, phase_id, completed_autonomous, completed_teleop), None
+
+    def _chaves_existentes(self, chaves):
+        """Submission keys of the batch that were already ingested"""
+        cursor = self.conn.cursor()
+        m = marcador(self.conn)
+        existentes = set()
+        for i in range(0, len(chaves), self.tamanho_lote):
+            lote = chaves[i:i + self.tamanho_lote]
+            cursor.execute(
+                f"SELECT submission_key FROM submissions_tb WHERE submission_key IN ({', '.join([m] * len(lote))})",
+                lote
+            )
+            existentes.update(row[0] for row in cursor.fetchall())
+        return existentes
+
+    def _inserir_em_lotes(self, cursor, tabela, colunas, linhas):
+        """Multi-row INSERT, tamanho_lote rows per statement"""
+        m = marcador(self.conn)
+        tupla = f"({', '.join([m] * len(colunas))})"
+        for i in range(0, len(linhas), self.tamanho_lote):
+            lote = linhas[i:i + self.tamanho_lote]
+            cursor.execute(
+                f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES {', '.join([tupla] * len(lote))}",
+                [valor for linha in lote for valor in linha]
+            )
+
+    def ingerir(self, submissoes):
+        """Validates, deduplicates and writes one batch in a single transaction.
+
+        Returns a dict with the number of inserted and duplicate submissions and the
+        list of rejected (submission_key, reason) pairs."""
+        if self._robos is None:
+            self._carregar_lookups()
+
+        # Robots created after the cache was loaded trigger a single refresh per batch
+        if any(
+            isinstance(s, dict) and str(s.get('robot_id', '')).strip().isdigit()
+            and int(s['robot_id']) not in self._robos
+            for s in submissoes
+        ):
+            self._carregar_lookups()
+
+        rejeitadas = []
+        validas = {}
+        duplicadas = 0
+        for submissao in submissoes:
+            chave = str(submissao.get('submission_key') or '').strip() if isinstance(submissao, dict) else ''
+            linha, motivo = self._validar(submissao)
+            if linha is None:
+                rejeitadas.append((chave, motivo))
+            elif chave in validas:
+                duplicadas += 1
+            else:
+                validas[chave] = linha
+
+        ja_ingeridas = self._chaves_existentes(list(validas))
+        duplicadas += len(ja_ingeridas)
+        novas = [(chave, linha) for chave, linha in validas.items() if chave not in ja_ingeridas]
+
+        linhas = [linha for _, linha in novas]
+        colunas = ['robot_id', 'challenge_id', 'phase_id', 'completed_autonomous', 'completed_teleop']
+        cursor = self.conn.cursor()
+        try:
+            self._inserir_em_lotes(cursor, 'scores_tb', colunas, linhas)
+            self._inserir_em_lotes(
+                cursor, 'submissions_tb', ['submission_key', 'robot_id'],
+                [(chave, linha[0]) for chave, linha in novas]
+            )
+            if self.atualizar_agregados and linhas:
+                atualizar_resumos(self.conn, pd.DataFrame(linhas, columns=colunas), commit=False)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        for linha in linhas:
+            self._pares.add((linha[1], linha[2]))
+            self._fases_com_desafio.add(linha[2])
+
+        return {'inseridas': len(linhas), 'duplicadas': duplicadas, 'rejeitadas': rejeitadas}
@@ -0,0 +1,87 @@
+# Point mapping
+POINTS_MAP = {
+    'LEAVE': {'auto': 3, 'teleop': 0},
+    'L1': {'auto': 3, 'teleop': 2},      # CORAL L1
+    'L2': {'auto': 4, 'teleop': 3},      # CORAL L2
+    'L3': {'auto': 6, 'teleop': 4},      # CORAL L3
+    'L4': {'auto': 7, 'teleop': 5},      # CORAL L4
+    'PROCESSOR': {'auto': 6, 'teleop': 6},
+    'NET': {'auto': 4, 'teleop': 4},
+    'PARK': {'auto': 0, 'teleop': 2},
+    'SHALLOW_CAGE': {'auto': 6, 'teleop': 6},
+    'DEEP_CAGE': {'auto': 12, 'teleop': 12}
+}
+
+# Transform phase_name to match POINTS_MAP keys if needed
+PHASE_MAPPING = {
+    'CORAL L1': 'L1',
+    'CORAL L2': 'L2',
+    'CORAL L3': 'L3',
+    'CORAL L4': 'L4',
+    'BARGE': 'PARK'
+    # Add other mappings if necessary
+}
+
+POINT_COLUMNS = ['auto_points', 'teleop_points', 'total_points']
+
+def pontos_da_fase(phase_name):
+    """Returns the (auto, teleop) points of one phase name, zero for unknown phases"""
+    points = POINTS_MAP.get(PHASE_MAPPING.get(phase_name, phase_name))
+    if points is None:
+        return 0, 0
+    return points['auto'], points['teleop']
+
+def calcular_pontos(df):
+    """Adds phase_key, auto_points, teleop_points and total_points to the score rows"""
+    df['phase_key'] = df['phase_name'].map(PHASE_MAPPING).fillna(df['phase_name'])
+    
+    # Calculate points - first create empty columns
+    df['auto_points'] = 0.0
+    df['teleop_points'] = 0.0
+    
+    # Vectorize operations where possible instead of looping
+    for phase, points in POINTS_MAP.items():
+        mask = df['phase_key'] == phase
+        df.loc[mask, 'auto_points'] = df.loc[mask, 'completed_autonomous'] * points['auto']
+        df.loc[mask, 'teleop_points'] = df.loc[mask, 'completed_teleop'] * points['teleop']
+    
+    # Calculate total points
+    df['total_points'] = df['auto_points'] + df['teleop_points']
+    
+    return df
+
+def ranquear(team_rankings):
+    """Adds the rank column (by total points) and sorts the table by it"""
+    team_rankings['rank'] = team_rankings['total_points'].rank(ascending=False, method='min').astype(int)
+    return team_rankings.sort_values('rank')
+
+def agregar_rankings(df):
+    """Team rankings and per-challenge rankings from processed score rows"""
+    # Calculate team rankings
+    team_rankings = df.groupby('team').agg({
+        'auto_points': 'sum',
+        'teleop_points': 'sum',
+        'total_points': 'sum'
+    }).reset_index()
+    
+    team_rankings = ranquear(team_rankings)
+    
+    # Calculate challenge-specific rankings
+    challenge_rankings = df.groupby(['team', 'challenge_name']).agg({
+        'auto_points': 'sum',
+        'teleop_points': 'sum', 
+        'total_points': 'sum'
+    }).reset_index()
+    
+    return team_rankings, challenge_rankings
+
+def matriz_equipe_fase(df, valor='total_points', equipes=None):
+    """Team × (challenge, phase) matrix of summed values.
+    
+    Also returns a boolean mask of the (challenge, phase) cells each team has score rows
+    for, which is what counts as phase coverage in the alliance builders."""
+    matriz = df.groupby(['team', 'challenge_name', 'phase_name'])[valor].sum().unstack(['challenge_name', 'phase_name'])
+    if equipes is not None:
+        matriz = matriz.reindex(equipes)
+    presenca = matriz.notna()
+    return matriz.fillna(0), presenca
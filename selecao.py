@@ -0,0 +1,236 @@
+"""Alliance selection draft simulator.
+
+Simulates the full FRC alliance selection: the top ranked teams are alliance captains,
+captains pick in serpentine order (1 to 8, then 8 to 1), a captain may pick a lower
+seeded captain (who then leaves their seat, and everyone below moves up), and invited
+teams may decline, after which they cannot be picked again.
+
+Candidate synergy uses the same phase-coverage rules as construir_alianca_otima, kept
+as one score row per alliance over all teams. After each pick only the picking
+alliance's row is rescored. Every invitation is snapshotted, so "what if this team
+declines" branches resume from that point instead of replaying the whole draft."""
+import numpy as np
+
+from pontuacao import matriz_equipe_fase
+
+class EstadoDraft:
+    """Mutable draft state: alliances, eligibility, phase coverage and synergy rows"""
+
+    def __init__(self, aliancas, recusadas, cobre_fase, cobre_desafio, max_pontos, sinergia, passo=0):
+        self.aliancas = aliancas            # list of lists of team indexes, captain first
+        self.recusadas = recusadas          # set of team indexes that declined
+        self.cobre_fase = cobre_fase        # (alliances, phases) bool
+        self.cobre_desafio = cobre_desafio  # (alliances, challenges) bool
+        self.max_pontos = max_pontos        # (alliances, phases) best points per phase
+        self.sinergia = sinergia            # (alliances, teams) synergy of each candidate
+        self.passo = passo                  # position in the pick order
+
+    def copiar(self):
+        return EstadoDraft(
+            [list(alianca) for alianca in self.aliancas],
+            set(self.recusadas),
+            self.cobre_fase.copy(),
+            self.cobre_desafio.copy(),
+            self.max_pontos.copy(),
+            self.sinergia.copy(),
+            self.passo
+        )
+
+    def membros(self, n_equipes):
+        """Alliance index of every team (-1 when unaffiliated)"""
+        membro = np.full(n_equipes, -1)
+        for k, alianca in enumerate(self.aliancas):
+            membro[alianca] = k
+        return membro
+
+class ModeloDraft:
+    """Precomputed team × phase data shared by every simulated draft"""
+
+    ESTRATEGIAS = ['sinergia', 'pontos', 'mista']
+
+    def __init__(self, df, team_rankings, n_aliancas=8, rodadas=2):
+        ordenado = team_rankings.sort_values(['rank', 'team'])
+        self.equipes = ordenado['team'].tolist()
+        self.total = ordenado['total_points'].to_numpy(dtype=float)
+
+        matriz, presenca = matriz_equipe_fase(df, equipes=self.equipes)
+        self.fases = list(matriz.columns)
+        self.pontos = matriz.to_numpy(dtype=float)
+        self.presenca = presenca.to_numpy()
+
+        desafios = sorted({desafio for desafio, _ in self.fases})
+        self.desafio_da_fase = np.array([desafios.index(desafio) for desafio, _ in self.fases], dtype=int)
+        self.n_desafios = len(desafios)
+
+        self.n_aliancas = min(n_aliancas, len(self.equipes))
+        # Serpentine pick order over alliance positions
+        self.ordem = [
+            k
+            for rodada in range(rodadas)
+            for k in (range(self.n_aliancas) if rodada % 2 == 0 else reversed(range(self.n_aliancas)))
+        ]
+
+    def _cobertura_vazia(self, n):
+        return (
+            np.zeros((n, len(self.fases)), dtype=bool),
+            np.zeros((n, self.n_desafios), dtype=bool),
+            np.zeros((n, len(self.fases)))
+        )
+
+    def _adicionar(self, estado, k, j):
+        """Adds team j to alliance k and rescores only that alliance's synergy row"""
+        estado.aliancas[k].append(j)
+        estado.cobre_fase[k] |= self.presenca[j]
+        estado.cobre_desafio[k, self.desafio_da_fase[self.presenca[j]]] = True
+        estado.max_pontos[k] = np.maximum(estado.max_pontos[k], np.where(self.presenca[j], self.pontos[j], 0))
+        self._pontuar(estado, k)
+
+    def _pontuar(self, estado, k):
+        # New challenge: 1.5x, new phase: 1.2x, covered phase: improvement over the best
+        cobre_desafio = estado.cobre_desafio[k][self.desafio_da_fase]
+        valor = np.where(
+            ~cobre_desafio,
+            1.5 * self.pontos,
+            np.where(~estado.cobre_fase[k], 1.2 * self.pontos, np.maximum(self.pontos - estado.max_pontos[k], 0))
+        )
+        estado.sinergia[k] = np.where(self.presenca, valor, 0).sum(axis=1)
+
+    def estado_inicial(self):
+        cobre_fase, cobre_desafio, max_pontos = self._cobertura_vazia(self.n_aliancas)
+        estado = EstadoDraft(
+            [[] for _ in range(self.n_aliancas)],
+            set(),
+            cobre_fase,
+            cobre_desafio,
+            max_pontos,
+            np.zeros((self.n_aliancas, len(self.equipes)))
+        )
+        for k in range(self.n_aliancas):
+            self._adicionar(estado, k, k)
+        return estado
+
+    def _elegiveis(self, estado, k):
+        """Unaffiliated teams plus lower captains that have not picked yet, minus declines"""
+        membro = estado.membros(len(self.equipes))
+        elegivel = membro == -1
+        for m in range(k + 1, len(estado.aliancas)):
+            if len(estado.aliancas[m]) == 1:
+                elegivel[estado.aliancas[m][0]] = True
+        if estado.recusadas:
+            elegivel[list(estado.recusadas)] = False
+        return elegivel
+
+    def _promover_capitaes(self, estado, m):
+        """Removes alliance m (its captain was picked) and seats the next best team as last captain"""
+        estado.aliancas.pop(m)
+        estado.cobre_fase = np.delete(estado.cobre_fase, m, axis=0)
+        estado.cobre_desafio = np.delete(estado.cobre_desafio, m, axis=0)
+        estado.max_pontos = np.delete(estado.max_pontos, m, axis=0)
+        estado.sinergia = np.delete(estado.sinergia, m, axis=0)
+
+        # Teams that declined may still be promoted to captain
+        membro = estado.membros(len(self.equipes))
+        livres = np.flatnonzero(membro == -1)
+        if len(livres) == 0:
+            return
+        cobre_fase, cobre_desafio, max_pontos = self._cobertura_vazia(1)
+        estado.aliancas.append([])
+        estado.cobre_fase = np.vstack([estado.cobre_fase, cobre_fase])
+        estado.cobre_desafio = np.vstack([estado.cobre_desafio, cobre_desafio])
+        estado.max_pontos = np.vstack([estado.max_pontos, max_pontos])
+        estado.sinergia = np.vstack([estado.sinergia, np.zeros((1, len(self.equipes)))])
+        self._adicionar(estado, len(estado.aliancas) - 1, livres[0])
+
+    def _escolher(self, estado, k, elegivel, estrategia):
+        if callable(estrategia):
+            return estrategia(self, estado, k, elegivel)
+
+        if estrategia == 'sinergia':
+            valor = estado.sinergia[k]
+        elif estrategia == 'pontos':
+            valor = self.total
+        elif estrategia == 'mista':
+            sinergia = estado.sinergia[k]
+            valor = sinergia / max(sinergia.max(), 1e-9) + self.total / max(self.total.max(), 1e-9)
+        else:
+            raise ValueError(f"Unknown pick strategy: {estrategia}")
+
+        return int(np.argmax(np.where(elegivel, valor, -np.inf)))
+
+    def simular(self, estrategia='sinergia', recusas=(), estado=None, snapshots=None, eventos=None):
+        """Runs the draft to completion.
+
+        recusas are team names that decline when invited. estrategia is one of
+        ESTRATEGIAS or a callable (modelo, estado, k, elegivel) -> team index. Returns a
+        dict with the alliances (team names), the invitation log and the snapshots
+        used for branching."""
+        indice = {equipe: i for i, equipe in enumerate(self.equipes)}
+        recusas = {indice[equipe] for equipe in recusas if equipe in indice}
+        estado = self.estado_inicial() if estado is None else estado
+        snapshots = [] if snapshots is None else snapshots
+        eventos = [] if eventos is None else eventos
+
+        while estado.passo < len(self.ordem):
+            k = self.ordem[estado.passo]
+            if k >= len(estado.aliancas):
+                estado.passo += 1
+                continue
+
+            elegivel = self._elegiveis(estado, k)
+            if not elegivel.any():
+                estado.passo += 1
+                continue
+
+            j = self._escolher(estado, k, elegivel, estrategia)
+            snapshots.append((estado.copiar(), j))
+            capitao = self.equipes[estado.aliancas[k][0]]
+
+            if j in recusas:
+                estado.recusadas.add(j)
+                eventos.append({'alianca': k + 1, 'capitao': capitao, 'equipe': self.equipes[j], 'aceitou': False})
+                continue
+
+            eventos.append({'alianca': k + 1, 'capitao': capitao, 'equipe': self.equipes[j], 'aceitou': True})
+            # Seat the pick before promoting captains so it is not promoted itself
+            m = estado.membros(len(self.equipes))[j]
+            if m >= 0:
+                estado.aliancas[m].remove(j)
+            self._adicionar(estado, k, j)
+            if m >= 0:
+                self._promover_capitaes(estado, m)
+            estado.passo += 1
+
+        return {
+            'aliancas': [[self.equipes[j] for j in alianca] for alianca in estado.aliancas],
+            'eventos': eventos,
+            'snapshots': snapshots,
+            'estrategia': estrategia,
+            'recusas': {self.equipes[j] for j in recusas},
+        }
+
+    def ramificar_recusa(self, resultado, equipe):
+        """What-if: the same draft, but `equipe` declines its first invitation.
+
+        Resumes from the snapshot taken right before that invitation."""
+        if equipe not in self.equipes:
+            return resultado
+        j = self.equipes.index(equipe)
+
+        for i, (estado, convidado) in enumerate(resultado['snapshots']):
+            if convidado == j:
+                return self.simular(
+                    resultado['estrategia'],
+                    resultado['recusas'] | {equipe},
+                    estado=estado.copiar(),
+                    snapshots=resultado['snapshots'][:i],
+                    eventos=resultado['eventos'][:i]
+                )
+
+        # Never invited: declining changes nothing
+        return resultado
+
+    def explorar_recusas(self, resultado, equipes=None):
+        """Branches the draft once per team declining; defaults to every picked team"""
+        if equipes is None:
+            equipes = [evento['equipe'] for evento in resultado['eventos'] if evento['aceitou']]
+        return {equipe: self.ramificar_recusa(resultado, equipe) for equipe in equipes}
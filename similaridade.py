@@ -0,0 +1,65 @@
+"""Nearest-neighbour search for robots that play alike.
+
+Each team is described by a feature vector over every (challenge, phase): points per
+robot entry and completions per robot entry. Features are standardized per column so
+that high-value phases do not drown the rest. The index is built once per data version;
+queries are a single matrix-vector product over the whole field."""
+import numpy as np
+import pandas as pd
+
+from pontuacao import matriz_equipe_fase
+
+METRICAS = ['cosseno', 'euclidiana']
+
+class IndiceSimilaridade:
+    """Standardized team × feature matrix with top-k cosine or Euclidean queries"""
+
+    def __init__(self, df):
+        df = df.assign(completions=df['completed_autonomous'] + df['completed_teleop'])
+        pontos, _ = matriz_equipe_fase(df, 'total_points')
+        equipes = pontos.index
+        completados, _ = matriz_equipe_fase(df, 'completions', equipes=equipes)
+
+        # Per-entry rates; summary-table data has no entries, so totals are used as-is
+        if 'robot_id' in df:
+            entradas = df.groupby('team')['robot_id'].nunique().reindex(equipes).to_numpy(dtype=float)
+        else:
+            entradas = np.ones(len(equipes))
+
+        atributos = np.hstack([pontos.to_numpy(dtype=float), completados.to_numpy(dtype=float)]) / entradas[:, None]
+
+        desvio = atributos.std(axis=0)
+        desvio[desvio == 0] = 1
+        self.equipes = list(equipes)
+        self.matriz = (atributos - atributos.mean(axis=0)) / desvio
+        self.quadrados = (self.matriz ** 2).sum(axis=1)
+
+        normas = np.sqrt(self.quadrados)
+        normas[normas == 0] = 1
+        self.unitaria = self.matriz / normas[:, None]
+        self._posicao = {equipe: i for i, equipe in enumerate(self.equipes)}
+
+    def buscar(self, equipe, k=5, metrica='cosseno'):
+        """Top-k teams most similar to `equipe` (itself excluded).
+
+        Returns a DataFrame with team and score: cosine similarity (higher is closer)
+        or Euclidean distance in standardized units (lower is closer)."""
+        i = self._posicao[equipe]
+
+        if metrica == 'cosseno':
+            pontuacao = self.unitaria @ self.unitaria[i]
+            pontuacao[i] = -np.inf
+            ordem = np.argsort(-pontuacao)
+        elif metrica == 'euclidiana':
+            quadrado = self.quadrados + self.quadrados[i] - 2 * (self.matriz @ self.matriz[i])
+            pontuacao = np.sqrt(np.maximum(quadrado, 0))
+            pontuacao[i] = np.inf
+            ordem = np.argsort(pontuacao)
+        else:
+            raise ValueError(f"Unknown similarity metric: {metrica}")
+
+        ordem = ordem[:min(k, len(self.equipes) - 1)]
+        return pd.DataFrame({
+            'team': [self.equipes[j] for j in ordem],
+            'score': pontuacao[ordem]
+        })
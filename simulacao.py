@@ -0,0 +1,87 @@
+"""Monte Carlo match outcome simulator for alliances.
+
+Each team's scoring is modelled by the empirical distribution of its points in every
+(challenge, phase), one sample per robot entry. A simulated match draws, for every
+team, one of that team's recorded entries as a whole, so the spread of match scores
+and the correlation between phases of one match (a robot that breaks scores zero in
+every phase) are kept without assuming any parametric shape. Draws are batched NumPy
+gathers; large runs can be split across a process pool."""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+QUANTIS = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+def construir_distribuicoes(df):
+    """Per-team matrices of points per robot entry (rows) and (challenge, phase) (columns).
+
+    Returns {'fases': [(challenge, phase), ...], 'equipes': {team: ndarray}}; all
+    matrices share the same column order, with 0 for phases a team never scored."""
+    por_entrada = df.pivot_table(
+        index=['team', 'robot_id'],
+        columns=['challenge_name', 'phase_name'],
+        values='total_points',
+        aggfunc='sum',
+        fill_value=0
+    )
+    valores = por_entrada.to_numpy(dtype=float)
+    equipes = por_entrada.index.get_level_values('team')
+
+    return {
+        'fases': list(por_entrada.columns),
+        'equipes': {team: valores[equipes == team] for team in equipes.unique()}
+    }
+
+def _pontuar_alianca(rng, matrizes, n_simulacoes):
+    """Simulated alliance scores: one bootstrap draw of a whole entry per team and match"""
+    total = np.zeros(n_simulacoes)
+    for matriz in matrizes:
+        n_entradas = matriz.shape[0]
+        if n_entradas == 0:
+            continue
+        sorteio = rng.integers(0, n_entradas, size=n_simulacoes)
+        total += matriz.sum(axis=1)[sorteio]
+    return total
+
+def _simular_lote(args):
+    """Runs one batch of matches (top-level so it can be sent to worker processes)"""
+    semente, matrizes_a, matrizes_b, n_simulacoes = args
+    rng = np.random.default_rng(semente)
+    return _pontuar_alianca(rng, matrizes_a, n_simulacoes), _pontuar_alianca(rng, matrizes_b, n_simulacoes)
+
+def simular_partidas(distribuicoes, alianca_a, alianca_b, n_simulacoes=20000, seed=None, processos=1, executor=None):
+    """Simulates n_simulacoes matches between two alliances (lists of teams).
+
+    Returns win/tie probabilities, mean scores and score quantiles of each alliance.
+    Teams without recorded entries contribute zero points. With processos > 1 the
+    batches run on `executor` when given (a long-lived ProcessPoolExecutor), otherwise
+    on a pool created for this call."""
+    vazia = np.zeros((0, len(distribuicoes['fases'])))
+    matrizes_a = [distribuicoes['equipes'].get(team, vazia) for team in alianca_a]
+    matrizes_b = [distribuicoes['equipes'].get(team, vazia) for team in alianca_b]
+
+    # Independent streams per batch keep results reproducible for a given seed
+    sementes = np.random.SeedSequence(seed).spawn(max(1, processos))
+    tamanhos = [len(parte) for parte in np.array_split(np.arange(n_simulacoes), len(sementes))]
+    lotes = [(semente, matrizes_a, matrizes_b, tamanho) for semente, tamanho in zip(sementes, tamanhos)]
+
+    if processos > 1 and executor is not None:
+        resultados = list(executor.map(_simular_lote, lotes))
+    elif processos > 1:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            resultados = list(pool.map(_simular_lote, lotes))
+    else:
+        resultados = [_simular_lote(lote) for lote in lotes]
+
+    pontos_a = np.concatenate([a for a, _ in resultados])
+    pontos_b = np.concatenate([b for _, b in resultados])
+
+    return {
+        'prob_vitoria_a': float(np.mean(pontos_a > pontos_b)),
+        'prob_empate': float(np.mean(pontos_a == pontos_b)),
+        'prob_vitoria_b': float(np.mean(pontos_a < pontos_b)),
+        'media_a': float(pontos_a.mean()),
+        'media_b': float(pontos_b.mean()),
+        'quantis_a': {q: float(v) for q, v in zip(QUANTIS, np.quantile(pontos_a, QUANTIS))},
+        'quantis_b': {q: float(v) for q, v in zip(QUANTIS, np.quantile(pontos_b, QUANTIS))},
+    }
@@ -0,0 +1,156 @@
+"""Incremental per-robot performance trends.
+
+All-time sums rank a robot that was broken early and strong now the same as one in
+decline. MotorTendencias keeps, per team and (challenge, phase), a rolling-window
+average and an exponentially weighted average over the team's robot entries (rows of
+robots_tb, in id order). New entries are folded in as they arrive. When rows arrive
+late for entries that were already consumed (offline tablets syncing in bursts), only
+the teams they belong to are replayed."""
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_TENDENCIA = ['auto_points', 'teleop_points', 'total_points', 'completed_autonomous', 'completed_teleop']
+MODOS = ['janela', 'ewma']
+
+class _TendenciaEquipe:
+    """Running state of one team: per-phase window sums and EWMA vectors"""
+
+    def __init__(self, janela):
+        self.janela = janela
+        self.entradas = 0
+        self.fases = {}  # (challenge, phase) -> [deque, window sum, ewma]
+        self.alliance = None
+
+    def adicionar(self, valores, alpha):
+        """Folds in one robot entry; valores maps (challenge, phase) to a value vector"""
+        zeros = np.zeros(len(COLUNAS_TENDENCIA))
+
+        # A phase seen for the first time counts as zero in the team's earlier entries
+        for fase in valores:
+            if fase not in self.fases:
+                anteriores = min(self.entradas, self.janela)
+                self.fases[fase] = [deque([zeros] * anteriores, maxlen=self.janela), zeros.copy(), zeros.copy()]
+
+        for fase, estado in self.fases.items():
+            valor = valores.get(fase, zeros)
+            janela, soma, _ = estado
+            if len(janela) == janela.maxlen:
+                soma -= janela[0]
+            janela.append(valor)
+            soma += valor
+            estado[2] = valor.copy() if self.entradas == 0 else (1 - alpha) * estado[2] + alpha * valor
+
+        self.entradas += 1
+
+class _EstadoTendencias:
+    """Consumed entries of one (janela, alpha) setting"""
+
+    def __init__(self, janela, alpha):
+        self.janela = janela
+        self.alpha = alpha
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self.equipes = {}
+        self.ultimo_robot_id = None
+        self.linhas_por_equipe = {}
+
+    def _equipes_alteradas(self, vistas):
+        """Teams whose rows up to ultimo_robot_id differ from the ones consumed"""
+        contagem = vistas['team'].value_counts().to_dict()
+        return {
+            team for team in set(contagem) | set(self.linhas_por_equipe)
+            if contagem.get(team, 0) != self.linhas_por_equipe.get(team, 0)
+        }
+
+    def atualizar(self, df):
+        if self.ultimo_robot_id is None:
+            novas = df
+        else:
+            ja_vistas = df['robot_id'] <= self.ultimo_robot_id
+            alteradas = self._equipes_alteradas(df[ja_vistas])
+            for team in alteradas:
+                self.equipes.pop(team, None)
+                self.linhas_por_equipe.pop(team, None)
+            # New entries plus every row of the teams being replayed
+            novas = df[~ja_vistas | df['team'].isin(alteradas)]
+        if novas.empty:
+            return 0
+
+        novas = novas.sort_values('robot_id')
+        valores = novas[COLUNAS_TENDENCIA].to_numpy(dtype=float)
+        robot_ids = novas['robot_id'].to_numpy()
+        equipes = novas['team'].to_numpy()
+        fases = list(zip(novas['challenge_name'], novas['phase_name']))
+        aliancas = novas['alliance'].to_numpy() if 'alliance' in novas else [None] * len(novas)
+
+        # Rows are sorted by entry, so each run of equal robot_id is one entry
+        inicio = 0
+        for fim in range(1, len(novas) + 1):
+            if fim < len(novas) and robot_ids[fim] == robot_ids[inicio]:
+                continue
+
+            equipe = self.equipes.setdefault(equipes[inicio], _TendenciaEquipe(self.janela))
+            entrada = {}
+            for i in range(inicio, fim):
+                entrada[fases[i]] = entrada.get(fases[i], 0) + valores[i]
+            equipe.adicionar(entrada, self.alpha)
+            equipe.alliance = aliancas[fim - 1]
+            inicio = fim
+
+        for team, linhas in novas['team'].value_counts().items():
+            self.linhas_por_equipe[team] = self.linhas_por_equipe.get(team, 0) + linhas
+        if self.ultimo_robot_id is None or robot_ids[-1] > self.ultimo_robot_id:
+            self.ultimo_robot_id = robot_ids[-1]
+        return len(novas)
+
+class MotorTendencias:
+    """Rolling-window and EWMA per-team, per-phase averages, updated incrementally.
+
+    State is kept per (janela, alpha) setting; only the `max_parametros` most recently
+    used settings are retained."""
+
+    def __init__(self, max_parametros=8):
+        self.max_parametros = max_parametros
+        self._estados = OrderedDict()
+        # The engine is shared between dashboard sessions
+        self._lock = threading.Lock()
+
+    def _estado(self, janela, alpha):
+        chave = (janela, alpha)
+        if chave in self._estados:
+            self._estados.move_to_end(chave)
+        else:
+            self._estados[chave] = _EstadoTendencias(janela, alpha)
+            if len(self._estados) > self.max_parametros:
+                self._estados.popitem(last=False)
+        return self._estados[chave]
+
+    def atualizar(self, df, janela=5, alpha=0.3):
+        """Consumes the robot entries of df newer than the last one seen at this setting.
+
+        df holds processed score rows with robot_id. If rows were added to (or removed
+        from) entries that were already consumed, the affected teams are replayed from
+        df. Returns the number of rows consumed."""
+        with self._lock:
+            return self._estado(janela, alpha).atualizar(df)
+
+    def como_dataframe(self, modo='janela', janela=5, alpha=0.3):
+        """Recent form as processed-like rows, one per (team, challenge, phase).
+
+        Values are per-entry averages, so the dashboard's groupby sums yield the
+        expected points per entry instead of all-time totals."""
+        if modo not in MODOS:
+            raise ValueError(f"Unknown trend mode: {modo}")
+
+        linhas = []
+        with self._lock:
+            for team, equipe in self._estado(janela, alpha).equipes.items():
+                for (challenge_name, phase_name), (fila, soma, ewma) in equipe.fases.items():
+                    media = soma / len(fila) if modo == 'janela' else ewma
+                    linhas.append((team, challenge_name, phase_name, equipe.alliance, *media))
+
+        return pd.DataFrame(linhas, columns=['team', 'challenge_name', 'phase_name', 'alliance'] + COLUNAS_TENDENCIA)